@@ -1,5 +1,6 @@
 from . import models
 from . import wizards
+from .models import cartona_log_partition
 
 
 def post_init_hook(env):
@@ -8,7 +9,12 @@ def post_init_hook(env):
     No placeholder config is auto-created: a config now requires a warehouse,
     and managers add one config per warehouse (with its token) from the
     Cartona configs list. This keeps fresh/empty/warehouse-less setups safe.
+
+    The sync log tables are converted to monthly partitions here on a fresh
+    install (migration 18.0.2.0.54 does it on upgrade).
     """
+    env.flush_all()
+    cartona_log_partition.partition_tables(env.cr)
     admin = env.ref('base.user_admin')
     manager_group = env.ref('cartona_odoo.group_cartona_manager')
     if manager_group not in admin.groups_id:
@@ -1,6 +1,6 @@
 {
     'name': 'Cartona Integration',
-    'version': '18.0.2.0.50',
+    'version': '18.0.2.0.55',
     'category': 'Sales',
     'summary': 'Cartona supplier integration for Odoo 18',
     'description': """
@@ -48,6 +48,7 @@ Connect Odoo to Cartona supplier-integrations API:
         'views/cartona_dashboard_views.xml',
         'views/cartona_sync_log_views.xml',
         'views/cartona_product_sync_views.xml',
+        'views/cartona_drift_report_views.xml',
         'views/product_views.xml',
         'views/res_partner_views.xml',
         'views/sale_order_views.xml',
@@ -7,7 +7,7 @@ import logging
 import uuid
 from collections import defaultdict, deque
 
-from .job import Job
+from .job import ENQUEUED, PENDING, WAIT_DEPENDENCIES, Job
 from .utils import must_run_without_delay
 
 _logger = logging.getLogger(__name__)
@@ -51,6 +51,76 @@ def chain(*delayables):
     return DelayableChain(*delayables)
 
 
+def delay_many(delayables):
+    """Delay independent delayables at once
+
+    Unlike :func:`group`, the delayables do not form a graph: each job is
+    the same as if its delayable had been delayed on its own, but all the
+    new jobs are stored with a single multi-row insert (see
+    :meth:`~odoo.addons.queue_job.job.Job.store_many`), which makes
+    enqueuing thousands of jobs much cheaper than calling ``delay()`` or
+    ``with_delay()`` in a loop.
+
+    As with ``delay()``, a delayable having the identity key of a job which
+    is not done yet is not enqueued again, neither is a second delayable
+    with the same identity key in ``delayables``.
+
+    Example::
+
+        delay_many(
+            record.delayable(channel="root.export").export_batch(batch)
+            for batch in batches
+        )
+
+    Returns the generated jobs, or the existing ``queue.job`` records for
+    the delayables that were not enqueued because of their identity key.
+    """
+    delayables = list(delayables)
+    if not delayables:
+        return []
+    for delayable in delayables:
+        if delayable._graph.edges():
+            raise ValueError(
+                f"{delayable} has dependencies, delay it with group() or chain()"
+            )
+
+    jobs = [delayable._build_job() for delayable in delayables]
+
+    envs = {delayable.recordset.env for delayable in delayables}
+    if any(must_run_without_delay(env) for env in envs):
+        for delayable in delayables:
+            delayable._execute_direct()
+        return jobs
+
+    existing_by_key = {}
+    identity_keys = {job.identity_key for job in jobs if job.identity_key}
+    if identity_keys:
+        existing = (
+            jobs[0]
+            .env["queue.job"]
+            .sudo()
+            .search(
+                [
+                    ("identity_key", "in", list(identity_keys)),
+                    ("state", "in", [WAIT_DEPENDENCIES, PENDING, ENQUEUED]),
+                ]
+            )
+        )
+        existing_by_key = {record.identity_key: record for record in existing}
+
+    to_store = []
+    for delayable, job in zip(delayables, jobs, strict=True):
+        if job.identity_key and job.identity_key in existing_by_key:
+            delayable._generated_job = existing_by_key[job.identity_key]
+            continue
+        if job.identity_key:
+            existing_by_key[job.identity_key] = job
+        to_store.append(job)
+
+    Job.store_many(to_store)
+    return [delayable._generated_job for delayable in delayables]
+
+
 class Graph:
     """Acyclic directed graph holding vertices of any hashable type
 
@@ -287,8 +357,7 @@ class DelayableGraph(Graph):
             vertex._generated_job = existing
             return
 
-        for vertex in vertices:
-            vertex._generated_job.store()
+        Job.store_many(vertex._generated_job for vertex in vertices)
 
     def _execute_graph_direct(self, graph):
         for delayable in graph.topological_sort():
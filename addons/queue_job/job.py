@@ -578,6 +578,36 @@ class Job:
                 self._store_values(create=True)
             )
 
+    @staticmethod
+    def store_many(jobs):
+        """Store several Jobs at once
+
+        The jobs not yet in the database are created with a single
+        ``create`` on ``queue.job`` (multi-row ``INSERT``), the existing ones
+        are written one by one as :meth:`store` does. All the jobs must use
+        the same environment.
+        """
+        jobs = list(jobs)
+        if not jobs:
+            return
+        env = jobs[0].env
+        job_model = env["queue.job"]
+        edit_sentinel = job_model.EDIT_SENTINEL
+
+        existing_uuids = set(
+            Job.db_records_from_uuids(env, [job.uuid for job in jobs]).mapped("uuid")
+        )
+        new_jobs = []
+        for job in jobs:
+            if job.uuid in existing_uuids:
+                job.store()
+            else:
+                new_jobs.append(job)
+        if new_jobs:
+            job_model.with_context(_job_edit_sentinel=edit_sentinel).sudo().create(
+                [job._store_values(create=True) for job in new_jobs]
+            )
+
     def _store_values(self, create=False):
         vals = {
             "state": self.state,
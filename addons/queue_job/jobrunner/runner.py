@@ -39,6 +39,7 @@ from .channels import ENQUEUED, NOT_DONE, ChannelManager
 SELECT_TIMEOUT = 60
 ERROR_RECOVERY_DELAY = 5
 PG_ADVISORY_LOCK_ID = 2293787760715711918
+NOTIFY_BATCH_SIZE = 1000
 
 _logger = logging.getLogger(__name__)
 
@@ -115,6 +116,24 @@ def _async_http_get(scheme, host, port, user, password, db_name, job_uuid):
     thread.start()
 
 
+def _split_notifications(payloads):
+    """Split queue_job notification payloads into job uuids (deduplicated,
+    in order) and ``id:<min>-<max>`` id ranges of inserted jobs.
+
+    >>> _split_notifications(["id:3-5", "a-uuid", "b-uuid", "a-uuid", "id:7-7"])
+    (['a-uuid', 'b-uuid'], [(3, 5), (7, 7)])
+    """
+    uuids = []
+    id_ranges = []
+    for payload in payloads:
+        if payload.startswith("id:"):
+            low, high = payload[3:].split("-")
+            id_ranges.append((int(low), int(high)))
+        else:
+            uuids.append(payload)
+    return list(dict.fromkeys(uuids)), id_ranges
+
+
 class Database:
     def __init__(self, db_name):
         self.db_name = db_name
@@ -168,8 +187,8 @@ class Database:
                 """SELECT COUNT(1)
                 FROM information_schema.triggers
                 WHERE event_object_table = %s
-                AND trigger_name = %s""",
-                ("queue_job", "queue_job_notify"),
+                AND trigger_name IN %s""",
+                ("queue_job", ("queue_job_notify", "queue_job_notify_insert")),
             )
             if cr.fetchone()[0] != 3:  # INSERT, DELETE, UPDATE
                 _logger.error(
@@ -436,17 +455,27 @@ class QueueJobRunner:
                 # causing some intermediaries (such as haproxy) to close the
                 # connection, making the jobrunner to restart on a socket error
                 db.keep_alive()
+            # drain the pending notifications: inserted jobs come as one id
+            # range per statement, updated or deleted ones as one uuid each,
+            # read with one query per NOTIFY_BATCH_SIZE uuids
+            payloads = []
             while db.conn.notifies:
                 if self._stop:
                     break
-                notification = db.conn.notifies.pop()
-                uuid = notification.payload
-                with db.select_jobs("uuid = %s", (uuid,)) as cr:
-                    job_datas = cr.fetchone()
-                    if job_datas:
+                payloads.append(db.conn.notifies.pop().payload)
+            uuids, id_ranges = _split_notifications(payloads)
+            for low, high in id_ranges:
+                with db.select_jobs("id BETWEEN %s AND %s", (low, high)) as cr:
+                    for job_datas in cr:
+                        self.channel_manager.notify(db.db_name, *job_datas)
+            for index in range(0, len(uuids), NOTIFY_BATCH_SIZE):
+                batch = set(uuids[index : index + NOTIFY_BATCH_SIZE])
+                with db.select_jobs("uuid IN %s", (tuple(batch),)) as cr:
+                    for job_datas in cr:
                         self.channel_manager.notify(db.db_name, *job_datas)
-                    else:
-                        self.channel_manager.remove_job(uuid)
+                        batch.discard(job_datas[1])
+                for uuid in batch:
+                    self.channel_manager.remove_job(uuid)
 
     def wait_notification(self):
         for db in self.db_by_name.values():
@@ -0,0 +1,10 @@
+# License LGPL-3.0 or later (http://www.gnu.org/licenses/lgpl.html)
+from openupgradelib import openupgrade
+
+from odoo.addons.queue_job.post_init_hook import post_init_hook
+
+
+@openupgrade.migrate()
+def migrate(env, version):
+    # Inserts now notify once per statement
+    post_init_hook(env)
@@ -7,11 +7,15 @@ logger = logging.getLogger(__name__)
 
 
 def post_init_hook(env):
-    # this is the trigger that sends notifications when jobs change
-    logger.info("Create queue_job_notify trigger")
+    # these are the triggers that send notifications when jobs change:
+    # updates and deletes notify the job's uuid, row by row; inserts send a
+    # single "id:<min>-<max>" notification per statement, so a bulk enqueue
+    # (delay_many) wakes the jobrunner once instead of once per job
+    logger.info("Create queue_job_notify triggers")
     env.cr.execute(
         """
             DROP TRIGGER IF EXISTS queue_job_notify ON queue_job;
+            DROP TRIGGER IF EXISTS queue_job_notify_insert ON queue_job;
             CREATE OR REPLACE
                 FUNCTION queue_job_notify() RETURNS trigger AS $$
             BEGIN
@@ -26,8 +30,25 @@ def post_init_hook(env):
             END;
             $$ LANGUAGE plpgsql;
             CREATE TRIGGER queue_job_notify
-                AFTER INSERT OR UPDATE OR DELETE
+                AFTER UPDATE OR DELETE
                 ON queue_job
                 FOR EACH ROW EXECUTE PROCEDURE queue_job_notify();
+            CREATE OR REPLACE
+                FUNCTION queue_job_notify_insert() RETURNS trigger AS $$
+            DECLARE
+                id_range text;
+            BEGIN
+                SELECT min(id) || '-' || max(id) INTO id_range FROM new_jobs;
+                IF id_range IS NOT NULL THEN
+                    PERFORM pg_notify('queue_job', 'id:' || id_range);
+                END IF;
+                RETURN NULL;
+            END;
+            $$ LANGUAGE plpgsql;
+            CREATE TRIGGER queue_job_notify_insert
+                AFTER INSERT
+                ON queue_job
+                REFERENCING NEW TABLE AS new_jobs
+                FOR EACH STATEMENT EXECUTE PROCEDURE queue_job_notify_insert();
         """
     )
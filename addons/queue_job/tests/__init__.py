@@ -3,6 +3,7 @@ from . import test_runner_channels
 from . import test_runner_runner
 from . import test_delayable
 from . import test_delayable_split
+from . import test_delay_many
 from . import test_json_field
 from . import test_model_job_channel
 from . import test_model_job_function
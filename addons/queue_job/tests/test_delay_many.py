@@ -0,0 +1,83 @@
+# License LGPL-3.0 or later (http://www.gnu.org/licenses/lgpl.html)
+
+from unittest import mock
+
+from odoo.tests import common
+
+from odoo.addons.queue_job.delay import delay_many
+from odoo.addons.queue_job.job import Job
+from odoo.addons.queue_job.models.queue_job import QueueJob
+
+
+class TestDelayMany(common.TransactionCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.partners = cls.env["res.partner"].create(
+            [{"name": f"Partner {index}"} for index in range(3)]
+        )
+
+    def _delayables(self, **properties):
+        return [
+            partner.delayable(**properties).write({"comment": "delayed"})
+            for partner in self.partners
+        ]
+
+    def test_delay_many_single_create(self):
+        with mock.patch.object(
+            QueueJob, "create", autospec=True, side_effect=QueueJob.create
+        ) as create:
+            jobs = delay_many(self._delayables(channel="root.test"))
+        self.assertEqual(create.call_count, 1)
+        self.assertEqual(len(create.call_args.args[1]), 3)
+        records = Job.db_records_from_uuids(self.env, [job.uuid for job in jobs])
+        self.assertEqual(len(records), 3)
+        self.assertEqual(set(records.mapped("channel")), {"root.test"})
+        self.assertEqual(set(records.mapped("state")), {"pending"})
+        # independent jobs, not a graph
+        self.assertFalse(any(records.mapped("graph_uuid")))
+
+    def test_delay_many_identity_key(self):
+        first = self.partners[0].delayable(identity_key="key-0")
+        first.write({"comment": "delayed"})
+        first.delay()
+        existing = first._generated_job
+
+        delayables = self._delayables()
+        delayables[0].set(identity_key="key-0")
+        delayables[1].set(identity_key="key-1")
+        delayables[2].set(identity_key="key-1")
+        jobs = delay_many(delayables)
+
+        self.assertEqual(jobs[0], existing.db_record())
+        self.assertIsInstance(jobs[1], Job)
+        self.assertEqual(jobs[2].uuid, jobs[1].uuid)
+        self.assertEqual(
+            self.env["queue.job"].search_count([("identity_key", "=", "key-1")]), 1
+        )
+
+    def test_delay_many_dependencies(self):
+        delayables = self._delayables()
+        delayables[0].on_done(delayables[1])
+        with self.assertRaises(ValueError):
+            delay_many(delayables)
+        # mark them delayed to silence the "never delayed" warning
+        for delayable in delayables:
+            delayable._generated_job = True
+
+    def test_store_many_existing(self):
+        job = Job(self.partners[0].write, args=({"comment": "delayed"},))
+        job.store()
+        job.priority = 30
+        new_job = Job(self.partners[1].write, args=({"comment": "delayed"},))
+        Job.store_many([job, new_job])
+        self.assertEqual(job.db_record().priority, 30)
+        self.assertTrue(new_job.db_record())
+
+    def test_insert_trigger_per_statement(self):
+        self.env.cr.execute(
+            "SELECT tgtype & 1 FROM pg_trigger WHERE tgname = %s",
+            ("queue_job_notify_insert",),
+        )
+        # bit 0 of tgtype is set for row-level triggers
+        self.assertEqual(self.env.cr.fetchone(), (0,))
@@ -0,0 +1,103 @@
+"""Benchmark Cartona order-line import: per-line create vs one bulk create.
+
+Run inside an Odoo shell against the dev database (needs a cartona.config and
+some saleable variants; nothing is committed):
+
+    docker compose exec -T web odoo shell -c /etc/odoo/odoo.conf -d cartona_dev \
+        --no-http < dev/bench_order_import.py
+
+"before" replays the old _create_order_lines loop (one sale.order.line create
+per item); "after" calls the current _create_order_lines (single create under
+a savepoint). Each size is timed REPEAT times and the median is printed.
+"""
+import statistics
+import time
+
+LINE_COUNTS = (10, 100, 500)
+REPEAT = 5
+
+
+def _items(variants, count):
+    return [
+        {
+            'internal_product_id': str(variants[i % len(variants)].id),
+            'quantity': 1.0,
+            'unit_price': 10.0,
+            'cartona_line_id': str(900000 + i),
+            'comment': False,
+        }
+        for i in range(count)
+    ]
+
+
+def _new_order(config, partner):
+    return env['sale.order'].with_context(skip_cartona_sync=True).create({  # noqa: F821
+        'partner_id': partner.id,
+        'company_id': config.company_id.id,
+        'warehouse_id': config.warehouse_id.id,
+        'cartona_config_id': config.id,
+        'cartona_id': 'bench',
+        'is_cartona_order': True,
+    })
+
+
+def _before(processor, order, items):
+    line_model = env['sale.order.line'].with_context(skip_cartona_sync=True)  # noqa: F821
+    for item in items:
+        product, _code, _msg = processor._resolve_variant(item, config=order.cartona_config_id)
+        line_model.create({
+            'order_id': order.id,
+            'product_id': product.id,
+            'name': product.name,
+            'product_uom_qty': item['quantity'],
+            'price_unit': item['unit_price'],
+            'cartona_line_id': item['cartona_line_id'],
+            'cartona_line_notes': item['comment'],
+        })
+
+
+def _after(processor, order, items):
+    issues = []
+    if not processor._create_order_lines(order, items, {}, issues):
+        raise RuntimeError(issues)
+
+
+def _time(config, partner, processor, fn, items):
+    samples = []
+    for _i in range(REPEAT):
+        with env.cr.savepoint() as savepoint:  # noqa: F821
+            order = _new_order(config, partner)
+            start = time.perf_counter()
+            fn(processor, order, items)
+            env.flush_all()  # noqa: F821
+            samples.append(time.perf_counter() - start)
+            savepoint.rollback()
+    return statistics.median(samples)
+
+
+def main():
+    config = env['cartona.config'].search([], limit=1)  # noqa: F821
+    if not config:
+        print('No cartona.config found')
+        return
+    variants = env['product.product'].search([  # noqa: F821
+        ('sale_ok', '=', True),
+        ('company_id', 'in', [False, config.company_id.id]),
+    ], limit=500)
+    if not variants:
+        print('No saleable variants found')
+        return
+    partner = env['res.partner'].search([], limit=1)  # noqa: F821
+    processor = env['cartona.order.processor'].with_company(config.company_id).with_context(  # noqa: F821
+        cartona_config_id=config.id,
+    )
+    print(f'{"lines":>6} {"before (s)":>11} {"after (s)":>10} {"speedup":>8}')
+    for count in LINE_COUNTS:
+        items = _items(variants, count)
+        before = _time(config, partner, processor, _before, items)
+        after = _time(config, partner, processor, _after, items)
+        print(f'{count:>6} {before:>11.3f} {after:>10.3f} {before / after:>7.1f}x')
+    env.cr.rollback()  # noqa: F821
+
+
+main()
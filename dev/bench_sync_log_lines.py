@@ -0,0 +1,89 @@
+"""Benchmark sync log detail lines: ORM create vs the unnest bulk insert.
+
+Run inside an Odoo shell against the dev database (needs a cartona.config;
+nothing is committed):
+
+    docker compose exec -T web odoo shell -c /etc/odoo/odoo.conf -d cartona_dev \
+        --no-http < dev/bench_sync_log_lines.py
+
+"before" creates the lines with cartona.sync.log.line create() (the old
+log_operation path); "after" calls _bulk_insert (single INSERT ... SELECT
+unnest). Each size is timed REPEAT times and the median is printed.
+"""
+import json
+import statistics
+import time
+
+LINE_COUNTS = (100, 1000, 10000)
+REPEAT = 5
+
+
+def _line_vals(count):
+    return [
+        {
+            'status': 'success',
+            'entry_type': 'product',
+            'internal_product_id': str(100000 + i),
+            'record_model': 'product.product',
+            'record_id': 100000 + i,
+            'record_name': f'Bench variant {i}',
+            'message': f'Synced variant Bench variant {i} (both)',
+            'request_data': json.dumps({
+                'endpoint': 'supplier-product/bulk-update',
+                'method': 'POST',
+                'sync_fields': 'both',
+                'payload': {'internal_product_id': str(100000 + i), 'price': 10.0, 'stock': i},
+            }, indent=2),
+            'response_data': '{"status": "ok"}',
+        }
+        for i in range(count)
+    ]
+
+
+def _new_log(config):
+    return env['cartona.sync.log'].sudo().create({  # noqa: F821
+        'cartona_config_id': config.id,
+        'operation_type': 'product_sync',
+        'status': 'success',
+        'message': 'bench',
+    })
+
+
+def _before(log, vals_list):
+    env['cartona.sync.log.line'].sudo().create([  # noqa: F821
+        {**vals, 'sync_log_id': log.id} for vals in vals_list
+    ])
+
+
+def _after(log, vals_list):
+    env['cartona.sync.log.line'].sudo()._bulk_insert(log, vals_list)  # noqa: F821
+
+
+def _time(config, fn, count):
+    samples = []
+    for _i in range(REPEAT):
+        vals_list = _line_vals(count)
+        with env.cr.savepoint() as savepoint:  # noqa: F821
+            log = _new_log(config)
+            start = time.perf_counter()
+            fn(log, vals_list)
+            env.flush_all()  # noqa: F821
+            samples.append(time.perf_counter() - start)
+            savepoint.rollback()
+    return statistics.median(samples)
+
+
+def main():
+    config = env['cartona.config'].search([], limit=1)  # noqa: F821
+    if not config:
+        print('No cartona.config found')
+        return
+    print(f'{"lines":>6} {"before (s)":>11} {"after (s)":>10} {"speedup":>8}')
+    for count in LINE_COUNTS:
+        before = _time(config, _before, count)
+        after = _time(config, _after, count)
+        print(f'{count:>6} {before:>11.3f} {after:>10.3f} {before / after:>7.1f}x')
+    env.cr.rollback()  # noqa: F821
+
+
+main()
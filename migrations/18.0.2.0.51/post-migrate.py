@@ -0,0 +1,48 @@
+import logging
+
+_logger = logging.getLogger(__name__)
+
+
+def _table_exists(cr, table):
+    cr.execute(
+        "SELECT 1 FROM information_schema.tables WHERE table_name = %s LIMIT 1",
+        (table,),
+    )
+    return bool(cr.fetchone())
+
+
+def _add_index(cr, index_name, table, columns_sql):
+    """Plain (non-CONCURRENTLY) index creation, see 18.0.2.0.50."""
+    cr.execute(
+        "SELECT 1 FROM pg_indexes WHERE indexname = %s",
+        (index_name,),
+    )
+    if cr.fetchone():
+        _logger.info('Cartona 18.0.2.0.51: index %s already exists, skipping', index_name)
+        return
+    _logger.info('Cartona 18.0.2.0.51: creating index %s on %s ...', index_name, table)
+    cr.execute(f"CREATE INDEX {index_name} ON {table} ({columns_sql})")
+    _logger.info('Cartona 18.0.2.0.51: index %s created', index_name)
+
+
+def migrate(cr, version):
+    _logger.info('Running cartona_odoo 18.0.2.0.51 post-migration (product sync anti-join index)')
+
+    # The retry cron and the dashboard pending counter look for eligible
+    # variants with no cartona_product_sync row for the config (NOT EXISTS
+    # anti-join), and for the config's rows in a given sync_status. Leading
+    # with cartona_config_id serves both: an index-only scan of one config's
+    # product_ids for a hashed anti-join, and the status filter. The
+    # (product_id, cartona_config_id) unique index still serves per-variant
+    # nested-loop probes.
+    if _table_exists(cr, 'cartona_product_sync'):
+        _add_index(
+            cr,
+            'cartona_product_sync_config_status_product_idx',
+            'cartona_product_sync',
+            'cartona_config_id, sync_status, product_id',
+        )
+    else:
+        _logger.info('Cartona 18.0.2.0.51: cartona_product_sync missing; skipping')
+
+    _logger.info('cartona_odoo 18.0.2.0.51 post-migration complete')
@@ -0,0 +1,47 @@
+import logging
+
+_logger = logging.getLogger(__name__)
+
+
+def _table_exists(cr, table):
+    cr.execute(
+        "SELECT 1 FROM information_schema.tables WHERE table_name = %s LIMIT 1",
+        (table,),
+    )
+    return bool(cr.fetchone())
+
+
+def _add_index(cr, index_name, table, columns_sql, where_sql=None):
+    """Plain (non-CONCURRENTLY) index creation, see 18.0.2.0.50."""
+    cr.execute(
+        "SELECT 1 FROM pg_indexes WHERE indexname = %s",
+        (index_name,),
+    )
+    if cr.fetchone():
+        _logger.info('Cartona 18.0.2.0.52: index %s already exists, skipping', index_name)
+        return
+    _logger.info('Cartona 18.0.2.0.52: creating index %s on %s ...', index_name, table)
+    where = f" WHERE {where_sql}" if where_sql else ""
+    cr.execute(f"CREATE INDEX {index_name} ON {table} ({columns_sql}){where}")
+    _logger.info('Cartona 18.0.2.0.52: index %s created', index_name)
+
+
+def migrate(cr, version):
+    _logger.info('Running cartona_odoo 18.0.2.0.52 post-migration (product sync retry index)')
+
+    # The retry cron picks a config's not_synced/error rows whose
+    # next_attempt_at is NULL or past, ordered by next_attempt_at. The
+    # partial index keeps synced rows (the vast majority) out of it and
+    # hands the rows back already in due order.
+    if _table_exists(cr, 'cartona_product_sync'):
+        _add_index(
+            cr,
+            'cartona_product_sync_retry_due_idx',
+            'cartona_product_sync',
+            'cartona_config_id, next_attempt_at NULLS FIRST, id',
+            "sync_status IN ('not_synced', 'error')",
+        )
+    else:
+        _logger.info('Cartona 18.0.2.0.52: cartona_product_sync missing; skipping')
+
+    _logger.info('cartona_odoo 18.0.2.0.52 post-migration complete')
@@ -0,0 +1,67 @@
+import logging
+
+from odoo import api, SUPERUSER_ID
+
+_logger = logging.getLogger(__name__)
+
+_CHUNK = 5000
+
+
+def _column_exists(cr, table, column):
+    cr.execute(
+        "SELECT 1 FROM information_schema.columns WHERE table_name = %s AND column_name = %s",
+        (table, column),
+    )
+    return bool(cr.fetchone())
+
+
+def _move_payloads(env, table):
+    """Move the request_data/response_data text columns of ``table`` into
+    cartona_sync_payload, then drop them."""
+    cr = env.cr
+    if not (_column_exists(cr, table, 'request_data')
+            and _column_exists(cr, table, 'response_data')):
+        _logger.info('Cartona 18.0.2.0.53: %s has no payload text columns; skipping', table)
+        return
+    payload_model = env['cartona.sync.payload']
+    last_id, moved = 0, 0
+    while True:
+        # Keyset pagination: every chunk is an index range scan on id.
+        cr.execute(f"""
+            SELECT id, request_data, response_data FROM {table}
+            WHERE id > %s AND (request_data IS NOT NULL OR response_data IS NOT NULL)
+            ORDER BY id
+            LIMIT %s
+        """, (last_id, _CHUNK))
+        rows = cr.fetchall()
+        if not rows:
+            break
+        ids_by_text = payload_model.store_texts(
+            [text for row in rows for text in row[1:] if text],
+        )
+        cr.execute(f"""
+            UPDATE {table} t
+            SET request_payload_id = v.request_payload_id,
+                response_payload_id = v.response_payload_id
+            FROM unnest(%s::int[], %s::int[], %s::int[])
+                AS v(id, request_payload_id, response_payload_id)
+            WHERE t.id = v.id
+        """, (
+            [row[0] for row in rows],
+            [ids_by_text.get(row[1]) for row in rows],
+            [ids_by_text.get(row[2]) for row in rows],
+        ))
+        last_id = rows[-1][0]
+        moved += len(rows)
+        if moved % (_CHUNK * 100) < _CHUNK:
+            _logger.info('Cartona 18.0.2.0.53: %s rows of %s moved so far', moved, table)
+    cr.execute(f"ALTER TABLE {table} DROP COLUMN request_data, DROP COLUMN response_data")
+    _logger.info('Cartona 18.0.2.0.53: moved payloads of %s rows of %s', moved, table)
+
+
+def migrate(cr, version):
+    _logger.info('Running cartona_odoo 18.0.2.0.53 post-migration (compressed log payloads)')
+    env = api.Environment(cr, SUPERUSER_ID, {})
+    for table in ('cartona_sync_log', 'cartona_sync_log_line'):
+        _move_payloads(env, table)
+    _logger.info('cartona_odoo 18.0.2.0.53 post-migration complete')
@@ -0,0 +1,20 @@
+import logging
+
+from odoo.addons.cartona_odoo.models import cartona_log_partition
+
+_logger = logging.getLogger(__name__)
+
+
+def migrate(cr, version):
+    # After the schema update: the ORM has created the columns added since
+    # (payload ids, 18.0.2.0.53), and the create_date NOT NULL the primary
+    # key needs is already declared on the models, so the next -u keeps it.
+    _logger.info('Running cartona_odoo 18.0.2.0.54 post-migration (partition sync log tables)')
+    cr.execute(
+        "SELECT 1 FROM information_schema.tables WHERE table_name = 'cartona_sync_log_line'",
+    )
+    if not cr.fetchone():
+        _logger.info('Cartona 18.0.2.0.54: sync log tables missing; skipping')
+        return
+    cartona_log_partition.partition_tables(cr)
+    _logger.info('cartona_odoo 18.0.2.0.54 post-migration complete')
@@ -0,0 +1,31 @@
+import logging
+
+_logger = logging.getLogger(__name__)
+
+
+def migrate(cr, version):
+    _logger.info('Running cartona_odoo 18.0.2.0.55 post-migration (per-config guard rows)')
+
+    # cartona.rate.limit rows are now created with their config instead of
+    # on the first API call, so acquire() never has to insert one.
+    cr.execute("""
+        INSERT INTO cartona_rate_limit
+            (cartona_config_id, tokens, refilled_at, create_date, write_date, create_uid, write_uid)
+        SELECT c.id, GREATEST(COALESCE(c.rate_limit_burst, 0), 1), now() AT TIME ZONE 'UTC',
+               now() AT TIME ZONE 'UTC', now() AT TIME ZONE 'UTC', 1, 1
+        FROM cartona_config c
+        ON CONFLICT (cartona_config_id) DO NOTHING
+    """)
+    _logger.info('Cartona 18.0.2.0.55: created %s rate limit rows', cr.rowcount)
+
+    # Same for cartona.circuit.breaker: a closed breaker is now one read.
+    cr.execute("""
+        INSERT INTO cartona_circuit_breaker
+            (cartona_config_id, state, failure_count, create_date, write_date, create_uid, write_uid)
+        SELECT c.id, 'closed', 0, now() AT TIME ZONE 'UTC', now() AT TIME ZONE 'UTC', 1, 1
+        FROM cartona_config c
+        ON CONFLICT (cartona_config_id) DO NOTHING
+    """)
+    _logger.info('Cartona 18.0.2.0.55: created %s circuit breaker rows', cr.rowcount)
+
+    _logger.info('cartona_odoo 18.0.2.0.55 post-migration complete')
@@ -1,9 +1,15 @@
 from . import cartona_config
 from . import cartona_api
+from . import cartona_rate_limit
+from . import cartona_circuit_breaker
 from . import cartona_product_sync
+from . import cartona_sync_outbox
+from . import cartona_drift_report
+from . import cartona_sync_payload
 from . import cartona_sync_log
 from . import cartona_sync_log_line
 from . import cartona_order_processor
+from . import cartona_order_fingerprint
 from . import cartona_mixin
 from . import product_template
 from . import product_product
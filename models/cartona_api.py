@@ -3,13 +3,49 @@ from odoo.exceptions import UserError
 import requests
 import json
 import logging
+import math
 import threading
-from datetime import datetime, timedelta
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from email.utils import parsedate_to_datetime
 
 from odoo.modules.registry import Registry
+from odoo.tools import float_compare
+from odoo.addons.queue_job.delay import delay_many
+from odoo.addons.queue_job.exception import RetryableJobError
+
+from . import cartona_http
+from .cartona_drift_report import DRIFT_COUNTERS
+from .cartona_sync_outbox import OUTBOX_FLUSH_MAX_BATCHES
 
 _logger = logging.getLogger(__name__)
 
+ORDER_PULL_PER_PAGE = 100
+# Safety stop for a misbehaving paginator that never returns a short page.
+ORDER_PULL_MAX_PAGES = 500
+# Window of the low-frequency deep rescan (and of the very first pull of a
+# config that has no watermark yet).
+ORDER_PULL_RESCAN_HOURS = 24
+# Session-level advisory lock class for "an order pull is running for config
+# <id>", so the minute cron, the deep rescan and a manual pull never process
+# the same window concurrently (held on a dedicated cursor, see
+# _order_pull_lock).
+ORDER_PULL_LOCK_CLASS = 7420
+# Batches whose variant ids the catalog fan-out reads, upserts and enqueues
+# per transaction (batch_size 100 -> 5,000 ids per commit).
+FANOUT_BATCHES_PER_CHUNK = 50
+RECONCILE_PER_PAGE = 100
+# Safety stop for the supplier-product listing paginator.
+RECONCILE_MAX_PAGES = 5000
+# A running drift report older than this is abandoned instead of resumed.
+RECONCILE_RESUME_HOURS = 12
+# A caller whose rate-limit token is at most this far away waits for it in
+# place; anything longer is handed back (job postponed / throttled result).
+RATE_LIMIT_MAX_INLINE_WAIT = 2.0
+# Block applied on a 429 that carries no usable Retry-After header.
+RATE_LIMIT_DEFAULT_RETRY_AFTER = 30
+
 
 class CartonaAPI(models.Model):
     _name = 'cartona.api'
@@ -49,21 +85,56 @@ class CartonaAPI(models.Model):
         url = f"{config.api_base_url.rstrip('/')}/{endpoint.lstrip('/')}"
         headers = config.get_api_headers()
         request_body = data if method.upper() in ('POST', 'PUT', 'PATCH') else (params or {})
+        # Callers on a latency budget (sell-out fast path) shorten the timeout.
+        timeout = self.env.context.get('cartona_request_timeout') or config.timeout
         request_params = {
             'url': url,
             'headers': headers,
-            'timeout': config.timeout,
+            'timeout': timeout,
         }
         if method.upper() in ('POST', 'PUT', 'PATCH'):
             request_params['json'] = data
         else:
             request_params['params'] = params or {}
 
+        breaker = self.env['cartona.circuit.breaker'].sudo()
+        # One side cursor for both guards: it sees the other workers' latest
+        # commits, which this transaction's snapshot does not.
+        with self.env.registry.cursor() as guard_cr:
+            wait, breaker_dirty = breaker.allow_request(config, cr=guard_cr)
+            rate_wait = 0 if wait else self._acquire_rate_limit(config, guard_cr)
+        if wait:
+            return self._deferred_call(
+                config, wait, f'Cartona circuit open, next probe in {wait:.0f}s',
+                self._api_log_fields(endpoint, method, request_body, None, 'Circuit open'),
+                reason='circuit_open',
+            )
+        wait = rate_wait
+        if wait:
+            return self._deferred_call(
+                config, wait, f'Rate limit reached, retry in {wait:.1f}s',
+                self._api_log_fields(endpoint, method, request_body, None, 'Rate limited'),
+            )
+
         try:
-            response = requests.request(method, **request_params)
+            response = cartona_http.get_session(config).request(method, **request_params)
             log_fields = self._api_log_fields(
                 endpoint, method, request_body, response.status_code, response.text,
             )
+            if response.status_code >= 500:
+                breaker.record_failure(config, f'HTTP {response.status_code}')
+            elif breaker_dirty and response.status_code != 429:
+                breaker.record_success(config)
+            if response.status_code == 429:
+                wait = self._retry_after_seconds(response)
+                self.env['cartona.rate.limit'].sudo().block(config, wait)
+                _logger.warning(
+                    'Cartona returned 429 for config %s, pausing calls for %.0fs',
+                    config.id, wait,
+                )
+                return self._deferred_call(
+                    config, wait, f'API Error 429, retry in {wait:.0f}s', log_fields,
+                )
             if response.status_code in (200, 201):
                 try:
                     body = response.json()
@@ -82,12 +153,16 @@ class CartonaAPI(models.Model):
             _logger.error(error_msg)
             return {'success': False, 'error': error_msg, **log_fields}
         except requests.exceptions.Timeout:
+            if timeout >= config.timeout:
+                # A deliberately short timeout says nothing about Cartona's health.
+                breaker.record_failure(config, f'Timeout after {timeout}s')
             return {
                 'success': False,
-                'error': f'Timeout after {config.timeout}s',
+                'error': f'Timeout after {timeout}s',
                 **self._api_log_fields(endpoint, method, request_body, None, 'Timeout'),
             }
         except requests.exceptions.ConnectionError as err:
+            breaker.record_failure(config, str(err))
             return {
                 'success': False,
                 'error': str(err),
@@ -100,6 +175,58 @@ class CartonaAPI(models.Model):
                 **self._api_log_fields(endpoint, method, request_body, None, str(err)),
             }
 
+    def _acquire_rate_limit(self, config, guard_cr):
+        """Take a request token for ``config``, waiting briefly if one is close.
+
+        Returns 0 once a token is held, else the seconds the caller should
+        back off for (long wait or a Retry-After block from Cartona).
+        """
+        rate_limit = self.env['cartona.rate.limit'].sudo()
+        wait = rate_limit.acquire(config, cr=guard_cr)
+        while 0 < wait <= RATE_LIMIT_MAX_INLINE_WAIT:
+            time.sleep(wait)
+            wait = rate_limit.acquire(config, cr=guard_cr)
+        return wait
+
+    def _retry_after_seconds(self, response):
+        value = (response.headers.get('Retry-After') or '').strip()
+        if not value:
+            return RATE_LIMIT_DEFAULT_RETRY_AFTER
+        try:
+            return max(float(value), 1.0)
+        except ValueError:
+            pass
+        try:
+            retry_at = parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return RATE_LIMIT_DEFAULT_RETRY_AFTER
+        if retry_at.tzinfo is None:
+            retry_at = retry_at.replace(tzinfo=timezone.utc)
+        return max((retry_at - datetime.now(timezone.utc)).total_seconds(), 1.0)
+
+    def _deferred_call(self, config, wait, error_msg, log_fields, reason='throttled'):
+        """Result of a call refused before reaching Cartona, or by a 429.
+
+        ``reason`` is 'throttled' (rate limiter / 429) or 'circuit_open'.
+        Inside a queue job the job is postponed by ``wait`` seconds without
+        spending one of its retries (the transaction is rolled back, so the
+        job simply runs again later). Elsewhere a failed result flagged with
+        ``reason`` is returned, like any other API error.
+        """
+        if self.env.context.get('job_uuid'):
+            raise RetryableJobError(
+                f'Cartona config {config.id}: {error_msg}',
+                seconds=max(int(wait + 0.999), 1),
+                ignore_retry=True,
+            )
+        return {
+            'success': False,
+            'error': error_msg,
+            reason: True,
+            'retry_after': wait,
+            **log_fields,
+        }
+
     def _normalize_api_response(self, response):
         if response is None:
             return {'success': False, 'error': 'No response'}
@@ -119,24 +246,51 @@ class CartonaAPI(models.Model):
             warehouse = config.warehouse_id
         return warehouse
 
-    def _build_variant_payload(self, variant, sync_fields, company=None, warehouse=None):
+    def _build_variant_payloads(self, variants, sync_fields, company=None, warehouse=None):
+        """Build the bulk-update payload of every variant, in ``variants`` order.
+
+        Free quantity is computed for the whole batch against the warehouse
+        in a single _compute_quantities_dict call (one grouped quant/move
+        query set) instead of one free_qty computation per variant.
+        """
         if company:
-            variant = variant.with_company(company)
+            variants = variants.with_company(company)
         if warehouse is None:
             warehouse = self._resolve_sync_warehouse(self._get_cartona_config())
-        payload = {'internal_product_id': str(variant.id)}
-        if sync_fields in ('price', 'both'):
-            payload['selling_price'] = str(variant.lst_price)
+        quantities = {}
         if sync_fields in ('stock', 'both'):
-            if variant.cartona_is_unlimited_stock:
-                payload['is_unlimited_stock'] = True
-            else:
-                payload['is_unlimited_stock'] = False
-                stock_variant = variant.with_context(warehouse_id=warehouse.id) if warehouse else variant
-                payload['available_stock_quantity'] = int(stock_variant.free_qty)
-        return payload
+            stock_variants = variants.filtered(lambda v: not v.cartona_is_unlimited_stock)
+            if warehouse:
+                stock_variants = stock_variants.with_context(warehouse_id=warehouse.id)
+            if stock_variants:
+                quantities = stock_variants._compute_quantities_dict(None, None, None)
+        payloads = []
+        for variant in variants:
+            payload = {'internal_product_id': str(variant.id)}
+            if sync_fields in ('price', 'both'):
+                payload['selling_price'] = str(variant.lst_price)
+            if sync_fields in ('stock', 'both'):
+                if variant.cartona_is_unlimited_stock:
+                    payload['is_unlimited_stock'] = True
+                else:
+                    payload['is_unlimited_stock'] = False
+                    payload['available_stock_quantity'] = int(quantities[variant.id]['free_qty'])
+            payloads.append(payload)
+        return payloads
 
-    def bulk_update_products(self, variants, sync_fields='both'):
+    def _build_variant_payload(self, variant, sync_fields, company=None, warehouse=None):
+        return self._build_variant_payloads(
+            variant, sync_fields, company=company, warehouse=warehouse,
+        )[0]
+
+    def bulk_update_products(self, variants, sync_fields='both', force=False):
+        """Push ``variants`` to Cartona in one bulk-update call.
+
+        Unless ``force`` is set, payloads whose values equal what Cartona last
+        accepted for this config are dropped before the HTTP call and
+        reported under ``unchanged_ids``; when nothing is left no request is
+        made at all. ``payloads``/``variant_ids`` list exactly what was sent.
+        """
         if not variants:
             return {'success': False, 'error': 'No variants'}
         if not self._sync_active():
@@ -145,10 +299,23 @@ class CartonaAPI(models.Model):
         config = self._get_cartona_config()
         company = config.company_id
         warehouse = self._resolve_sync_warehouse(config)
-        products_data = [
-            self._build_variant_payload(v, sync_fields, company=company, warehouse=warehouse)
-            for v in variants
-        ]
+        sync_model = self.env['cartona.product.sync'].sudo()
+        products_data = self._build_variant_payloads(
+            variants, sync_fields, company=company, warehouse=warehouse,
+        )
+        unchanged_ids = []
+        if not force:
+            products_data, unchanged_ids = sync_model.split_unchanged_payloads(
+                config, products_data,
+            )
+        if not products_data:
+            return {
+                'success': True,
+                'sync_fields': sync_fields,
+                'variant_ids': [],
+                'unchanged_ids': unchanged_ids,
+                'payloads': [],
+            }
         result = self._make_api_request(
             'supplier-product/bulk-update', method='POST', data=products_data,
         )
@@ -156,19 +323,83 @@ class CartonaAPI(models.Model):
         for key in ('request_data', 'response_data'):
             if result.get(key):
                 normalized[key] = result[key]
+        if normalized.get('success'):
+            sync_model.remember_pushed_payloads(config, products_data)
         normalized['sync_fields'] = sync_fields
-        normalized['variant_ids'] = variants.ids
+        normalized['variant_ids'] = [int(payload['internal_product_id']) for payload in products_data]
+        normalized['unchanged_ids'] = unchanged_ids
+        # Exactly what was sent, in variants order - callers log these instead
+        # of rebuilding payloads (and recomputing stock) after the fact.
+        normalized['payloads'] = products_data
         return normalized
 
-    def pull_orders(self, from_date, to_date, page=1, per_page=100):
+    def pull_orders(self, from_date, to_date, per_page=ORDER_PULL_PER_PAGE):
+        """Yield one normalized ``order/pull-orders`` response per page.
+
+        Keeps requesting the next page until one comes back short (fewer
+        than ``per_page`` orders), empty, past the reported ``last_page``,
+        or failed - the failed response is yielded so the caller can log it.
+        """
         params = {
-            'page': page,
             'per_page': per_page,
             'from': from_date.isoformat() if isinstance(from_date, datetime) else from_date,
             'to': to_date.isoformat() if isinstance(to_date, datetime) else to_date,
         }
-        result = self._make_api_request('order/pull-orders', method='GET', params=params)
-        return self._normalize_api_response(result)
+        for page in range(1, ORDER_PULL_MAX_PAGES + 1):
+            result = self._make_api_request(
+                'order/pull-orders', method='GET', params=dict(params, page=page),
+            )
+            result = self._normalize_api_response(result)
+            result['page'] = page
+            yield result
+            if not result.get('success'):
+                return
+            orders_data = result.get('data') or []
+            if not isinstance(orders_data, list) or len(orders_data) < per_page:
+                return
+            meta = result.get('meta') if isinstance(result.get('meta'), dict) else {}
+            last_page = result.get('last_page') or meta.get('last_page')
+            if last_page and page >= int(last_page):
+                return
+        _logger.warning(
+            'Cartona order pull stopped at page cap %s (%s .. %s)',
+            ORDER_PULL_MAX_PAGES, params['from'], params['to'],
+        )
+        # Reported as a failed page so the caller treats the window as
+        # incomplete (and does not advance its watermark past it).
+        yield {
+            'success': False,
+            'error': f'Stopped at page cap {ORDER_PULL_MAX_PAGES}',
+            'page': ORDER_PULL_MAX_PAGES + 1,
+        }
+
+    def list_supplier_products(self, per_page=RECONCILE_PER_PAGE, start_page=1):
+        """Yield one normalized ``GET supplier-product`` response per page.
+
+        Same stop rules as pull_orders: short or empty page, reported
+        ``last_page``, or a failure (yielded so the caller can record it).
+        """
+        for page in range(start_page, RECONCILE_MAX_PAGES + 1):
+            result = self._make_api_request(
+                'supplier-product', method='GET', params={'page': page, 'per_page': per_page},
+            )
+            result = self._normalize_api_response(result)
+            result['page'] = page
+            yield result
+            if not result.get('success'):
+                return
+            items = result.get('data') or []
+            if not isinstance(items, list) or len(items) < per_page:
+                return
+            meta = result.get('meta') if isinstance(result.get('meta'), dict) else {}
+            last_page = result.get('last_page') or meta.get('last_page')
+            if last_page and page >= int(last_page):
+                return
+        yield {
+            'success': False,
+            'error': f'Stopped at page cap {RECONCILE_MAX_PAGES}',
+            'page': RECONCILE_MAX_PAGES + 1,
+        }
 
     def update_single_order_status(self, order_record, new_status):
         if not order_record.cartona_id:
@@ -213,6 +444,7 @@ class CartonaAPI(models.Model):
             'method': 'POST',
             'payload': payload,
         })
+        http = cartona_http.get_session(config)
 
         def _post_ack():
             response_status = None
@@ -220,8 +452,8 @@ class CartonaAPI(models.Model):
             log_status = 'error'
             message = _('Inbound synced ack failed for order %s') % cartona_id
             try:
-                response = requests.post(
-                    url, json=payload, headers=headers, timeout=timeout,
+                response = http.request(
+                    'POST', url, json=payload, headers=headers, timeout=timeout,
                 )
                 response_status = response.status_code
                 try:
@@ -286,63 +518,44 @@ class CartonaAPI(models.Model):
         )
         return self._normalize_api_response(result)
 
-    def pull_and_process_orders(self, since_date=None):
-        import time
-        start = time.time()
-        config = self._get_cartona_config()
-        action_type = self.env.context.get('cartona_log_action_type', 'automated')
-        if not config.is_cartona_sync_enabled:
-            return {'success': False, 'message': 'Cartona sync disabled', 'orders_pulled': 0}
-
-        to_date = datetime.now()
-        from_date = since_date or (to_date - timedelta(hours=24))
-        result = self.pull_orders(from_date=from_date, to_date=to_date)
-        if not result.get('success'):
-            error_msg = result.get('error', 'Pull failed')
-            self.env['cartona.sync.log'].log_operation(
-                cartona_config_id=config.id,
-                operation_type='order_pull',
-                status='error',
-                message=f'Order pull failed: {error_msg}',
-                records_error=1,
-                error_details=error_msg,
-                duration=time.time() - start,
-                action_type=action_type,
-            )
-            return {
-                'success': False,
-                'message': error_msg,
-                'orders_pulled': 0,
-            }
+    def _process_order_page(self, config, orders_data, page, action_type, skip_unchanged=True):
+        """Process one page of pulled orders and log it as its own entry.
 
-        orders_data = result.get('data', [])
-        if not orders_data:
-            self.env['cartona.sync.log'].log_operation(
-                cartona_config_id=config.id,
-                operation_type='order_pull',
-                status='info',
-                message='No orders found in date range',
-                duration=time.time() - start,
-                action_type=action_type,
-            )
-            return {
-                'success': True,
-                'message': 'No orders in date range',
-                'orders_pulled': 0,
-                'orders_new': 0,
-                'orders_updated': 0,
-            }
-
-        processor = self.env['cartona.order.processor'].with_company(config.company_id)
+        Returns the page counters for pull_and_process_orders to aggregate;
+        detail lines are logged here so they never pile up across pages.
+        With ``skip_unchanged``, orders whose status and order_details
+        fingerprint matches the last successfully processed payload are
+        counted as unchanged and never reach the processor.
+        """
+        start = time.time()
+        processor = self.env['cartona.order.processor'].with_company(config.company_id).with_context(
+            cartona_config_id=config.id,
+        )
+        fingerprint_model = self.env['cartona.order.fingerprint'].sudo()
+        if skip_unchanged:
+            changed, orders_unchanged = fingerprint_model.split_unchanged(config, orders_data)
+        else:
+            changed = [
+                (order_data, fingerprint_model.compute_fingerprint(order_data)
+                 if isinstance(order_data, dict) and order_data.get('hashed_id') else None)
+                for order_data in orders_data
+            ]
+            orders_unchanged = 0
         orders_processed = orders_new = orders_updated = orders_skipped = 0
         errors = []
         detail_lines = []
-        for order_data in orders_data:
+        processed_fingerprints = {}
+        prefetch = processor.prefetch_order_page(
+            [order_data for order_data, _fingerprint in changed], config,
+        )
+        for order_data, fingerprint in changed:
             try:
-                proc_result = processor.with_context(
-                    cartona_config_id=config.id,
-                ).process_cartona_order(order_data)
-                detail_lines.extend(proc_result.get('issues', []))
+                proc_result = processor.process_cartona_order(order_data, prefetch=prefetch)
+                issues = proc_result.get('issues', [])
+                detail_lines.extend(issues)
+                if (fingerprint and proc_result.get('success')
+                        and not any(issue.get('status') == 'error' for issue in issues)):
+                    processed_fingerprints[order_data['hashed_id']] = fingerprint
                 if proc_result.get('success'):
                     orders_processed += 1
                     if proc_result.get('is_new'):
@@ -360,10 +573,7 @@ class CartonaAPI(models.Model):
                     'error_code': 'unexpected_error',
                 })
                 _logger.error('Order processing error: %s', err)
-
-        config._update_sync_stats()
-        config._refresh_dashboard_issues_if_stale(force=True)
-        config.write({'last_order_pull': fields.Datetime.now()})
+        fingerprint_model.remember(config, processed_fingerprints)
 
         total_errors = len(errors) + orders_skipped
         if total_errors and not orders_processed:
@@ -378,8 +588,9 @@ class CartonaAPI(models.Model):
             operation_type='order_pull',
             status=status,
             message=(
-                f'Pulled {len(orders_data)} orders: '
+                f'Pulled {len(orders_data)} orders (page {page}): '
                 f'{orders_processed} processed ({orders_new} new, {orders_updated} updated)'
+                + (f', {orders_unchanged} unchanged' if orders_unchanged else '')
                 + (f', {orders_skipped} skipped' if orders_skipped else '')
                 + (f', {len(errors)} errors' if errors else '')
             ),
@@ -396,12 +607,166 @@ class CartonaAPI(models.Model):
             line_vals_list=detail_lines,
         )
         return {
-            'success': True,
-            'message': f'Processed {orders_processed} orders',
-            'orders_pulled': len(orders_data),
-            'orders_new': orders_new,
-            'orders_updated': orders_updated,
-            'orders_skipped': orders_skipped,
+            'pulled': len(orders_data),
+            'processed': orders_processed,
+            'new': orders_new,
+            'updated': orders_updated,
+            'skipped': orders_skipped,
+            'unchanged': orders_unchanged,
+            'errors': errors,
+        }
+
+    def _order_pull_window(self, config, since_date=None, deep_rescan=False):
+        """Return (from_date, to_date) for the next pull of ``config``.
+
+        Steady state is incremental: from the config's watermark
+        (last_order_pull) minus its overlap margin. A deep rescan, or a
+        config that has never completed a pull, goes back the full
+        ORDER_PULL_RESCAN_HOURS instead.
+        """
+        to_date = fields.Datetime.now()
+        if since_date:
+            return since_date, to_date
+        if deep_rescan or not config.last_order_pull:
+            return to_date - timedelta(hours=ORDER_PULL_RESCAN_HOURS), to_date
+        overlap = timedelta(minutes=max(config.order_pull_overlap_minutes, 0))
+        return config.last_order_pull - overlap, to_date
+
+    @contextmanager
+    def _order_pull_lock(self, config):
+        """Yield whether this pull got the config's order-pull lock.
+
+        The session-level lock is taken on a dedicated cursor that runs
+        nothing else, so unlocking cannot be prevented by an error aborting
+        the pull's transaction, and the lock never stays behind on a pooled
+        connection. Its transaction is committed straight away so that
+        cursor does not hold a snapshot for the length of the pull.
+        """
+        with self.env.registry.cursor() as lock_cr:
+            lock_cr.execute(
+                'SELECT pg_try_advisory_lock(%s, %s)', (ORDER_PULL_LOCK_CLASS, config.id),
+            )
+            locked = lock_cr.fetchone()[0]
+            lock_cr.commit()
+            try:
+                yield locked
+            finally:
+                if locked:
+                    lock_cr.execute(
+                        'SELECT pg_advisory_unlock(%s, %s)', (ORDER_PULL_LOCK_CLASS, config.id),
+                    )
+
+    def pull_and_process_orders(self, since_date=None, deep_rescan=False):
+        """Pull the config's order window and process it page by page.
+
+        Without ``since_date`` the window starts at the config's watermark
+        (see _order_pull_window). The watermark only moves once every page of
+        an incremental window has been committed; a deep rescan re-reads the
+        last ORDER_PULL_RESCAN_HOURS as a safety net, re-processes orders even
+        when their payload fingerprint is unchanged, and never moves it.
+        """
+        config = self._get_cartona_config()
+        if not config.is_cartona_sync_enabled:
+            return {'success': False, 'message': 'Cartona sync disabled', 'orders_pulled': 0}
+        with self._order_pull_lock(config) as locked:
+            if not locked:
+                return {'success': True, 'message': 'Order pull already running', 'orders_pulled': 0}
+            return self._pull_and_process_orders_locked(
+                config, since_date=since_date, deep_rescan=deep_rescan,
+            )
+
+    def _pull_and_process_orders_locked(self, config, since_date=None, deep_rescan=False):
+        """Stream every page of the pull window, committing after each one.
+
+        A failure on page N leaves pages 1..N-1 imported and logged; only the
+        failing page is rolled back.
+        """
+        start = time.time()
+        action_type = self.env.context.get('cartona_log_action_type', 'automated')
+        from_date, to_date = self._order_pull_window(
+            config, since_date=since_date, deep_rescan=deep_rescan,
+        )
+        totals = {'pulled': 0, 'processed': 0, 'new': 0, 'updated': 0, 'skipped': 0, 'unchanged': 0}
+        errors = []
+        error_msg = None
+        for result in self.pull_orders(from_date=from_date, to_date=to_date):
+            page = result.get('page')
+            if not result.get('success'):
+                error_msg = result.get('error', 'Pull failed')
+                break
+            orders_data = result.get('data') or []
+            if not orders_data:
+                break
+            try:
+                page_totals = self._process_order_page(
+                    config, orders_data, page, action_type, skip_unchanged=not deep_rescan,
+                )
+                self.env.cr.commit()
+            except Exception as err:
+                self.env.cr.rollback()
+                error_msg = f'page {page}: {err}'
+                _logger.error('Cartona order pull failed on page %s: %s', page, err)
+                break
+            errors.extend(page_totals.pop('errors'))
+            for key, value in page_totals.items():
+                totals[key] += value
+
+        stats_vals = {}
+        if deep_rescan:
+            stats_vals['last_order_rescan'] = to_date
+        elif not error_msg and not since_date:
+            stats_vals['last_order_pull'] = to_date
+        if stats_vals:
+            config.write(stats_vals)
+            self.env.cr.commit()
+
+        if error_msg:
+            self.env['cartona.sync.log'].log_operation(
+                cartona_config_id=config.id,
+                operation_type='order_pull',
+                status='error',
+                message=f'Order pull failed: {error_msg}',
+                records_error=1,
+                error_details=error_msg,
+                duration=time.time() - start,
+                action_type=action_type,
+            )
+            if not totals['pulled']:
+                return {
+                    'success': False,
+                    'message': error_msg,
+                    'orders_pulled': 0,
+                }
+        elif not totals['pulled']:
+            self.env['cartona.sync.log'].log_operation(
+                cartona_config_id=config.id,
+                operation_type='order_pull',
+                status='info',
+                message='No orders found in date range',
+                duration=time.time() - start,
+                action_type=action_type,
+            )
+            return {
+                'success': True,
+                'message': 'No orders in date range',
+                'orders_pulled': 0,
+                'orders_new': 0,
+                'orders_updated': 0,
+            }
+
+        config._update_sync_stats()
+        config._refresh_dashboard_issues_if_stale(force=True)
+        return {
+            'success': not error_msg,
+            'message': (
+                f'Processed {totals["processed"]} orders'
+                + (f' (stopped early: {error_msg})' if error_msg else '')
+            ),
+            'orders_pulled': totals['pulled'],
+            'orders_new': totals['new'],
+            'orders_updated': totals['updated'],
+            'orders_skipped': totals['skipped'],
+            'orders_unchanged': totals['unchanged'],
             'errors': errors,
         }
 
@@ -415,6 +780,16 @@ class CartonaAPI(models.Model):
             except Exception as err:
                 _logger.error('Cron order pull failed for company %s: %s', config.company_id.name, err)
 
+    @api.model
+    def cron_rescan_orders(self):
+        for config in self.env['cartona.config'].search([('is_cartona_sync_enabled', '=', True)]):
+            try:
+                self.with_company(config.company_id).with_context(
+                    cartona_config_id=config.id,
+                ).pull_and_process_orders(deep_rescan=True)
+            except Exception as err:
+                _logger.error('Cron order rescan failed for company %s: %s', config.company_id.name, err)
+
     @api.model
     def cron_retry_product_sync(self):
         for config in self.env['cartona.config'].search([('is_cartona_sync_enabled', '=', True)]):
@@ -425,29 +800,94 @@ class CartonaAPI(models.Model):
             except Exception as err:
                 _logger.error('Cron product retry failed for company %s: %s', config.company_id.name, err)
 
+    @api.model
+    def cron_flush_sync_outbox(self):
+        for config in self.env['cartona.config'].search([('is_cartona_sync_enabled', '=', True)]):
+            try:
+                self.with_company(config.company_id).with_context(
+                    cartona_config_id=config.id,
+                ).flush_sync_outbox()
+                self.with_company(config.company_id).with_context(
+                    cartona_config_id=config.id,
+                ).resume_deferred_order_status()
+            except Exception as err:
+                _logger.error('Cron outbox flush failed for company %s: %s', config.company_id.name, err)
+
+    def resume_deferred_order_status(self, limit=200):
+        """Re-queue order status pushes parked while the circuit was open."""
+        config = self._get_cartona_config()
+        if not config.is_cartona_sync_enabled:
+            return
+        if self.env['cartona.circuit.breaker'].sudo().is_open(config):
+            return
+        orders = self.env['sale.order'].search([
+            ('cartona_config_id', '=', config.id),
+            ('cartona_sync_status', '=', 'deferred'),
+        ], order='id', limit=limit)
+        if orders:
+            orders.write({'cartona_sync_status': 'not_synced'})
+            orders._trigger_status_sync()
+
+    def flush_sync_outbox(self):
+        """Drain the config's pending stock pushes into one job per batch.
+
+        N dirty variants become ceil(N / batch_size) bulk-update calls
+        instead of N single-variant _sync_to_cartona jobs.
+        """
+        config = self._get_cartona_config()
+        if not config.is_cartona_sync_enabled:
+            return
+        if self.env['cartona.circuit.breaker'].sudo().is_open(config):
+            # Leave the work parked until the breaker lets a probe through.
+            return
+        variant_ids = self.env['cartona.sync.outbox'].sudo().drain(
+            config, config.batch_size * OUTBOX_FLUSH_MAX_BATCHES,
+        )
+        variants = self.env['product.product'].with_company(config.company_id).browse(
+            variant_ids,
+        ).exists()
+        if not variants:
+            return
+        self.env['cartona.product.sync'].ensure_for_products(variants, config)
+        batches = [
+            variants[i:i + config.batch_size]
+            for i in range(0, len(variants), config.batch_size)
+        ]
+        total = len(batches)
+        delay_many(
+            self.delayable(
+                **config._queue_job_options('stock'),
+                description=_('Push stock batch %(idx)s/%(total)s to Cartona [%(wh)s]') % {
+                    'idx': idx, 'total': total, 'wh': config.warehouse_id.name,
+                },
+            ).sync_variant_batch_job(config.id, batch.ids, idx, total, action_type='automated')
+            for idx, batch in enumerate(batches, start=1)
+        )
+
     def _collect_variants_for_retry(self, config, limit=100):
         sync_model = self.env['cartona.product.sync']
+        # Only rows whose back-off has elapsed, oldest due first, so variants
+        # that keep failing wait their turn instead of starving the backlog
+        # (served by the partial index of the 18.0.2.0.52 migration).
         sync_recs = sync_model.search([
             ('cartona_config_id', '=', config.id),
             ('sync_status', 'in', ['not_synced', 'error']),
-        ], limit=limit)
+            '|',
+            ('next_attempt_at', '=', False),
+            ('next_attempt_at', '<=', fields.Datetime.now()),
+        ], order='next_attempt_at asc nulls first, id', limit=limit)
         variants = sync_recs.mapped('product_id')
         remaining = max(0, limit - len(variants))
         if remaining:
-            synced_product_ids = sync_model.search([
-                ('cartona_config_id', '=', config.id),
-            ]).mapped('product_id').ids
-            extra_products = self.env['product.product'].with_company(config.company_id).search([
-                ('sale_ok', '=', True),
-                ('company_id', 'in', [False, config.company_id.id]),
-                ('id', 'not in', synced_product_ids),
-            ], limit=remaining)
+            extra_products = self.env['product.product'].with_company(config.company_id).browse(
+                config._search_eligible_products_without_sync(limit=remaining, order='id'),
+            )
             if extra_products:
                 sync_model.ensure_for_products(extra_products, config)
                 variants |= extra_products
         return variants, sync_model
 
-    def _sync_one_batch(self, config, batch):
+    def _sync_one_batch(self, config, batch, force=False):
         """Sync a single batch (<= config.batch_size variants) in one HTTP call.
 
         Returns (success_count, error_count, detail_lines, result) for the
@@ -455,31 +895,46 @@ class CartonaAPI(models.Model):
         run either inline (small synchronous callers) or as the body of its
         own queue_job job (large fan-out, see sync_variant_batch_job) without
         ever holding a DB lock for longer than one batch's HTTP call.
+
+        Variants bulk_update_products skipped as unchanged count as synced
+        but get no detail line; ``force`` pushes them anyway.
         """
         sync_model = self.env['cartona.product.sync']
-        company = config.company_id
-        warehouse = config.warehouse_id
-        batch = batch.with_company(company)
+        batch = batch.with_company(config.company_id)
         batch_sync_recs = sync_model.search([
             ('cartona_config_id', '=', config.id),
             ('product_id', 'in', batch.ids),
         ])
         batch_sync_recs.mark_syncing()
-        result = self.bulk_update_products(batch, sync_fields='both')
-        batch_payloads = [
-            self._build_variant_payload(variant, 'both', company=company, warehouse=warehouse)
-            for variant in batch
-        ]
+        result = self.bulk_update_products(batch, sync_fields='both', force=force)
+        if result.get('circuit_open'):
+            # Cartona is down: park the batch instead of failing it.
+            self.env['cartona.sync.outbox'].sudo().mark_dirty(batch, config)
+            batch_sync_recs.mark_deferred(result.get('error'))
+            return 0, 0, [], result
+        if result.get('throttled'):
+            # Refused by the rate limiter before reaching Cartona: not a
+            # failed attempt, the rows are due again after the wait.
+            batch_sync_recs.mark_throttled(result.get('error'), result.get('retry_after'))
+            return 0, 0, [], result
+        unchanged_ids = set(result.get('unchanged_ids') or [])
+        sent = batch.filtered(lambda variant: variant.id not in unchanged_ids)
+        sent_payloads = result.get('payloads') or [None] * len(sent)
+        unchanged_sync_recs = batch_sync_recs.filtered(
+            lambda rec: rec.product_id.id in unchanged_ids,
+        )
+        sent_sync_recs = batch_sync_recs - unchanged_sync_recs
+        unchanged_sync_recs.mark_success()
         detail_lines = []
         if result.get('success'):
             success_count, error_count = len(batch), 0
-            batch_sync_recs.mark_success()
+            sent_sync_recs.mark_success()
             status, message_tpl = 'success', _('Synced variant %s')
         else:
-            success_count, error_count = 0, len(batch)
-            batch_sync_recs.mark_error(result.get('error', 'Unknown error'))
+            success_count, error_count = len(unchanged_ids), len(sent)
+            sent_sync_recs.mark_error(result.get('error', 'Unknown error'))
             status, message_tpl = 'error', _('Failed to sync variant %s')
-        for variant, payload in zip(batch, batch_payloads):
+        for variant, payload in zip(sent, sent_payloads):
             detail_lines.append({
                 'status': status,
                 'entry_type': 'product',
@@ -504,8 +959,6 @@ class CartonaAPI(models.Model):
         sync_all_variants_fanout instead, to avoid holding one job/DB
         connection open for the whole run (see JobFoundDead investigation).
         """
-        import time
-
         sync_model = self.env['cartona.product.sync']
         if not variants:
             return
@@ -524,6 +977,10 @@ class CartonaAPI(models.Model):
             if batch_error:
                 last_error = result.get('error', 'Unknown error')
             detail_lines.extend(batch_detail_lines)
+            if result.get('throttled') or result.get('circuit_open'):
+                # Every later batch would be refused too; the retry cron picks
+                # the remaining variants up on its next run.
+                break
         self.env['cartona.sync.log'].log_operation(
             cartona_config_id=config.id,
             operation_type='product_sync',
@@ -554,6 +1011,8 @@ class CartonaAPI(models.Model):
         config = self._get_cartona_config()
         if not config.is_cartona_sync_enabled:
             return
+        if self.env['cartona.circuit.breaker'].sudo().is_open(config):
+            return
         variants, _sync_model = self._collect_variants_for_retry(config, limit=limit)
         if not variants:
             return
@@ -563,28 +1022,65 @@ class CartonaAPI(models.Model):
             summary_message='Retry sync finished: {success} succeeded, {error} failed ({total} total)',
         )
 
-    def sync_all_variants_fanout(self, config, variants):
+    def _iter_eligible_variant_ids(self, config, chunk_size):
+        """Yield the config's eligible variant ids in ascending chunks.
+
+        Keyset pagination on id (``id > last seen``, ordered, limited): every
+        chunk is one cheap index range scan, no OFFSET, and only one chunk of
+        ids is held at a time.
+        """
+        product_model = self.env['product.product'].with_company(config.company_id)
+        domain = config._dashboard_eligible_product_domain()
+        last_id = 0
+        while True:
+            ids = product_model.search(
+                domain + [('id', '>', last_id)], order='id', limit=chunk_size,
+            ).ids
+            if not ids:
+                return
+            yield ids
+            if len(ids) < chunk_size:
+                return
+            last_id = ids[-1]
+
+    def sync_all_variants_fanout(self, config, force=False):
         """Fan large catalogs out into one small, independently-retryable
         queue_job per batch, instead of one job looping through every batch
         (which for large warehouses held a single DB connection/lock open
         for minutes and was getting killed mid-run - JobFoundDead).
+
+        The catalog itself is streamed too: FANOUT_BATCHES_PER_CHUNK batches'
+        worth of ids at a time are upserted into cartona.product.sync,
+        enqueued and committed before the next chunk is read, so memory and
+        transaction length stay flat whatever the catalog size.
         """
         sync_model = self.env['cartona.product.sync']
-        sync_model.ensure_for_products(variants, config)
-        batches = [
-            variants[i:i + config.batch_size]
-            for i in range(0, len(variants), config.batch_size)
-        ]
-        total = len(batches)
-        for idx, batch in enumerate(batches, start=1):
-            self.with_delay(
-                channel='cartona',
-                description=_('Sync variant batch %(idx)s/%(total)s to Cartona [%(wh)s]') % {
-                    'idx': idx, 'total': total, 'wh': config.warehouse_id.name,
-                },
-            ).sync_variant_batch_job(config.id, batch.ids, idx, total)
+        product_model = self.env['product.product'].with_company(config.company_id)
+        batch_size = config.batch_size
+        total = math.ceil(
+            product_model.search_count(config._dashboard_eligible_product_domain()) / batch_size
+        )
+        idx = 0
+        for ids in self._iter_eligible_variant_ids(config, batch_size * FANOUT_BATCHES_PER_CHUNK):
+            sync_model.ensure_for_products(product_model.browse(ids), config)
+            delayables = []
+            for i in range(0, len(ids), batch_size):
+                idx += 1
+                delayables.append(self.delayable(
+                    **config._queue_job_options('bulk'),
+                    description=_('Sync variant batch %(idx)s/%(total)s to Cartona [%(wh)s]') % {
+                        'idx': idx, 'total': max(total, idx), 'wh': config.warehouse_id.name,
+                    },
+                ).sync_variant_batch_job(
+                    config.id, ids[i:i + batch_size], idx, max(total, idx), force=force,
+                ))
+            # One multi-row INSERT into queue_job per chunk instead of one per batch.
+            delay_many(delayables)
+            self.env.cr.commit()
+            self.env.invalidate_all()
 
-    def sync_variant_batch_job(self, config_id, variant_ids, batch_index, batch_total):
+    def sync_variant_batch_job(self, config_id, variant_ids, batch_index, batch_total,
+                               action_type='manual', force=False):
         """Queue job entrypoint for one batch of sync_all_variants_fanout.
 
         config_id is an explicit argument (not context) for the same reason
@@ -603,8 +1099,14 @@ class CartonaAPI(models.Model):
             cartona_config_id=config.id,
             cartona_warehouse_id=config.warehouse_id.id,
         )
-        variants = self.env['product.product'].with_company(config.company_id).browse(variant_ids)
-        success_count, error_count, detail_lines, result = self._sync_one_batch(config, variants)
+        variants = self.env['product.product'].with_company(config.company_id).browse(
+            variant_ids,
+        ).exists()
+        if not variants:
+            return
+        success_count, error_count, detail_lines, result = self._sync_one_batch(
+            config, variants, force=force,
+        )
         self.env['cartona.sync.log'].log_operation(
             cartona_config_id=config.id,
             operation_type='product_sync',
@@ -618,7 +1120,7 @@ class CartonaAPI(models.Model):
             request_data=result.get('request_data'),
             response_data=result.get('response_data'),
             line_vals_list=detail_lines,
-            action_type='manual',
+            action_type=action_type,
         )
         config._update_sync_stats()
         # Not forced: this scans cartona.sync.log/.line (millions of rows) and was
@@ -630,15 +1132,166 @@ class CartonaAPI(models.Model):
         # means at most one refresh per cache window across an entire run.
         config._refresh_dashboard_issues_if_stale()
 
-    def sync_all_variants(self):
+    def _drift_kinds(self, payload, item):
+        """Kinds ('price', 'stock', 'unlimited') on which Cartona's ``item``
+        differs from the payload Odoo would push for the variant."""
+        kinds = []
+        try:
+            if float_compare(
+                float(item.get('selling_price')), float(payload['selling_price']),
+                precision_digits=2,
+            ):
+                kinds.append('price')
+        except (TypeError, ValueError):
+            kinds.append('price')
+        remote_unlimited = bool(item.get('is_unlimited_stock'))
+        if remote_unlimited != payload['is_unlimited_stock']:
+            kinds.append('unlimited')
+        elif not remote_unlimited:
+            try:
+                remote_stock = int(float(item.get('available_stock_quantity') or 0))
+            except (TypeError, ValueError):
+                remote_stock = None
+            if remote_stock != payload['available_stock_quantity']:
+                kinds.append('stock')
+        return kinds
+
+    def _reconcile_page(self, config, items):
+        """Compare one supplier-product page with Odoo and push the drifted variants.
+
+        Returns the page's drift report counters.
+        """
+        counters = dict.fromkeys(DRIFT_COUNTERS, 0)
+        counters['items_scanned'] = len(items)
+        remote = {}
+        for item in items:
+            internal_id = str(item.get('internal_product_id') or '') if isinstance(item, dict) else ''
+            if internal_id.isdigit():
+                remote[int(internal_id)] = item
+        variants = self.env['product.product'].with_company(config.company_id).search(
+            [('id', 'in', list(remote))] + config._dashboard_eligible_product_domain(),
+        )
+        counters['unmapped_count'] = len(items) - len(variants)
+        payloads = self._build_variant_payloads(
+            variants, 'both', company=config.company_id, warehouse=config.warehouse_id,
+        )
+        drifted_ids = []
+        for payload in payloads:
+            product_id = int(payload['internal_product_id'])
+            kinds = self._drift_kinds(payload, remote[product_id])
+            for kind in kinds:
+                counters[f'{kind}_mismatch_count'] += 1
+            if kinds:
+                drifted_ids.append(product_id)
+            else:
+                counters['in_sync_count'] += 1
+        drifted = variants.browse(drifted_ids)
+        if not drifted:
+            return counters
+        sync_recs = self.env['cartona.product.sync'].sudo().ensure_for_products(drifted, config)
+        for i in range(0, len(drifted), config.batch_size):
+            batch = drifted[i:i + config.batch_size]
+            batch_sync_recs = sync_recs.filtered(lambda rec: rec.product_id in batch)
+            # Forced: the remembered values are exactly what turned out stale.
+            result = self.bulk_update_products(batch, sync_fields='both', force=True)
+            if result.get('success'):
+                counters['pushed_count'] += len(batch)
+                batch_sync_recs.mark_success()
+            else:
+                counters['push_error_count'] += len(batch)
+                batch_sync_recs.mark_error(result.get('error', 'Unknown error'))
+        return counters
+
+    def reconcile_catalog(self):
+        """Stream the supplier's Cartona catalog and correct drift page by page.
+
+        Each page is compared with what Odoo would push (price, stock,
+        unlimited flag); only mismatching variants are pushed. Progress is
+        committed per page into a cartona.drift.report, so a run postponed
+        by the rate limiter/circuit breaker or killed mid-way resumes from
+        the next page instead of starting over.
+        """
         config = self._get_cartona_config()
         if not config.is_cartona_sync_enabled:
             return
-        company = config.company_id
-        variants = self.env['product.product'].with_company(company).search([
-            ('sale_ok', '=', True),
-            ('company_id', 'in', [False, company.id]),
-        ])
-        if not variants:
+        start = time.time()
+        report_model = self.env['cartona.drift.report'].sudo()
+        report = report_model.search([
+            ('cartona_config_id', '=', config.id),
+            ('state', '=', 'running'),
+        ], limit=1)
+        if report and report.date_start < fields.Datetime.now() - timedelta(hours=RECONCILE_RESUME_HOURS):
+            report.write({
+                'state': 'failed',
+                'date_end': fields.Datetime.now(),
+                'error_message': _('Abandoned: not finished within %s hours') % RECONCILE_RESUME_HOURS,
+            })
+            report = report_model
+        if not report:
+            report = report_model.create({'cartona_config_id': config.id})
+        self.env.cr.commit()
+
+        error_msg = None
+        for result in self.list_supplier_products(start_page=report.pages_scanned + 1):
+            if not result.get('success'):
+                error_msg = result.get('error', 'Listing failed')
+                break
+            items = result.get('data') or []
+            if not isinstance(items, list) or not items:
+                break
+            report.add_page(result['page'], self._reconcile_page(config, items))
+            self.env.cr.commit()
+
+        report.write({
+            'state': 'failed' if error_msg else 'done',
+            'date_end': fields.Datetime.now(),
+            'error_message': error_msg,
+        })
+        if error_msg:
+            status = 'error'
+        elif report.push_error_count:
+            status = 'warning'
+        else:
+            status = 'success'
+        self.env['cartona.sync.log'].log_operation(
+            cartona_config_id=config.id,
+            operation_type='bulk_operation',
+            status=status,
+            message=report.summary(),
+            records_processed=report.items_scanned,
+            records_success=report.pushed_count,
+            records_error=report.push_error_count,
+            error_details=error_msg,
+            duration=time.time() - start,
+            action_type=self.env.context.get('cartona_log_action_type', 'automated'),
+        )
+        self.env.cr.commit()
+        return report
+
+    def reconcile_catalog_job(self, config_id, action_type='automated'):
+        """Queue job entrypoint of reconcile_catalog (explicit config_id, see
+        sync_variant_batch_job)."""
+        config = self.env['cartona.config'].browse(config_id)
+        if not config.exists() or not config.is_cartona_sync_enabled:
+            return
+        self.with_company(config.company_id).with_context(
+            cartona_config_id=config.id,
+            cartona_warehouse_id=config.warehouse_id.id,
+            cartona_log_action_type=action_type,
+        ).reconcile_catalog()
+
+    @api.model
+    def cron_reconcile_catalog(self):
+        for config in self.env['cartona.config'].search([('is_cartona_sync_enabled', '=', True)]):
+            config._enqueue_catalog_reconciliation()
+
+    def sync_all_variants(self, force=False):
+        """Push every saleable variant of the config's company.
+
+        Without ``force`` only variants whose price/stock differ from what
+        Cartona last accepted are actually sent.
+        """
+        config = self._get_cartona_config()
+        if not config.is_cartona_sync_enabled:
             return
-        self.sync_all_variants_fanout(config, variants)
+        self.sync_all_variants_fanout(config, force=force)
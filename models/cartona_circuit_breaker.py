@@ -0,0 +1,181 @@
+import logging
+
+from odoo import models, fields, api
+
+_logger = logging.getLogger(__name__)
+
+
+class CartonaCircuitBreaker(models.Model):
+    """Closed / open / half-open breaker guarding the Cartona API of one config.
+
+    Like cartona.rate.limit, the row is created with its config, then only
+    read and written with raw SQL on a dedicated cursor that commits
+    immediately: every worker sees a trip at once, and the state survives
+    the rollback of the job that tripped it. While closed it is only read.
+    It lives beside cartona_config rather than on it so these side-cursor
+    updates never race the config's own writes (sync stats, watermarks)
+    under REPEATABLE READ. cartona.config shows it through computed fields.
+
+    - closed: calls go through; consecutive failures (timeouts, connection
+      errors, 5xx) are counted and the breaker opens at the config's
+      circuit_failure_threshold.
+    - open: calls are refused without touching the network until
+      circuit_reset_seconds have passed since it opened.
+    - half_open: one caller was let through as a probe. Success closes the
+      breaker, failure re-opens it; a probe that never reports back is
+      replaced after another circuit_reset_seconds.
+    """
+    _name = 'cartona.circuit.breaker'
+    _description = 'Cartona API Circuit Breaker State (per config)'
+
+    _sql_constraints = [
+        (
+            'config_uniq',
+            'unique(cartona_config_id)',
+            'Only one circuit breaker state per Cartona configuration.',
+        ),
+    ]
+
+    cartona_config_id = fields.Many2one(
+        'cartona.config',
+        required=True,
+        ondelete='cascade',
+    )
+    state = fields.Selection([
+        ('closed', 'Closed'),
+        ('open', 'Open'),
+        ('half_open', 'Half-Open'),
+    ], default='closed', required=True, readonly=True)
+    failure_count = fields.Integer(readonly=True)
+    opened_at = fields.Datetime(readonly=True)
+    last_error = fields.Text(readonly=True)
+
+    @api.model
+    def _create_for_configs(self, configs):
+        """Create the (closed) breaker rows of new configs."""
+        self.sudo().create([{'cartona_config_id': config.id} for config in configs])
+
+    @api.model
+    def allow_request(self, config, cr=None):
+        """Decide whether ``config`` may call Cartona now.
+
+        Returns ``(wait, dirty)``: ``wait`` is 0 when the call may proceed
+        (normally, or as the half-open probe), otherwise the seconds until
+        the next probe is due. ``dirty`` tells the caller a success must be
+        reported with record_success (probe, or failures to reset). A
+        closed breaker costs one read-only SELECT. ``cr`` is the caller's
+        dedicated guard cursor (see cartona.api._make_request); one is
+        opened otherwise.
+        """
+        if cr is None:
+            with self.env.registry.cursor() as cr:
+                return self.allow_request(config, cr=cr)
+        params = {'config_id': config.id, 'reset': config.circuit_reset_seconds}
+        cr.execute("""
+            SELECT state, failure_count,
+                   EXTRACT(EPOCH FROM opened_at
+                       + make_interval(secs => %(reset)s)
+                       - (now() AT TIME ZONE 'UTC'))
+            FROM cartona_circuit_breaker
+            WHERE cartona_config_id = %(config_id)s
+        """, params)
+        row = cr.fetchone()
+        if not row or row[0] == 'closed':
+            return 0, bool(row and row[1])
+        state, _failure_count, remaining = row
+        if remaining is not None and remaining > 0:
+            return float(remaining), True
+        # Cool-down over: the caller that wins this row becomes the probe.
+        cr.execute("""
+            UPDATE cartona_circuit_breaker
+            SET state = 'half_open', opened_at = now() AT TIME ZONE 'UTC'
+            WHERE id IN (
+                SELECT id FROM cartona_circuit_breaker
+                WHERE cartona_config_id = %(config_id)s AND state = %(state)s
+                FOR UPDATE SKIP LOCKED
+            )
+            RETURNING id
+        """, {**params, 'state': state})
+        probe = cr.fetchone()
+        cr.commit()
+        if probe:
+            _logger.info('Cartona circuit for config %s half-open, probing', config.id)
+            return 0, True
+        return float(config.circuit_reset_seconds), True
+
+    @api.model
+    def is_open(self, config):
+        """True while calls for ``config`` would be refused (probe not due yet)."""
+        with self.env.registry.cursor() as cr:
+            cr.execute("""
+                SELECT 1 FROM cartona_circuit_breaker
+                WHERE cartona_config_id = %s
+                  AND state != 'closed'
+                  AND opened_at + make_interval(secs => %s) > now() AT TIME ZONE 'UTC'
+            """, (config.id, config.circuit_reset_seconds))
+            return bool(cr.fetchone())
+
+    @api.model
+    def record_success(self, config):
+        with self.env.registry.cursor() as cr:
+            cr.execute("""
+                WITH old AS (
+                    SELECT id, state FROM cartona_circuit_breaker
+                    WHERE cartona_config_id = %s AND (state != 'closed' OR failure_count > 0)
+                    FOR UPDATE
+                )
+                UPDATE cartona_circuit_breaker breaker
+                SET state = 'closed', failure_count = 0, opened_at = NULL, last_error = NULL
+                FROM old
+                WHERE breaker.id = old.id
+                RETURNING old.state
+            """, (config.id,))
+            row = cr.fetchone()
+        if row and row[0] != 'closed':
+            _logger.info('Cartona circuit for config %s closed', config.id)
+
+    @api.model
+    def record_failure(self, config, error):
+        with self.env.registry.cursor() as cr:
+            # Rows are created with the config; this only covers a lost one.
+            cr.execute("""
+                INSERT INTO cartona_circuit_breaker
+                    (cartona_config_id, state, failure_count, create_date, write_date, create_uid, write_uid)
+                VALUES (%(config_id)s, 'closed', 0, now(), now(), %(uid)s, %(uid)s)
+                ON CONFLICT (cartona_config_id) DO NOTHING
+            """, {'config_id': config.id, 'uid': self.env.uid})
+            cr.execute("""
+                WITH old AS (
+                    SELECT id, state, failure_count FROM cartona_circuit_breaker
+                    WHERE cartona_config_id = %(config_id)s
+                    FOR UPDATE
+                ), new AS (
+                    SELECT id, state AS old_state, failure_count + 1 AS failure_count,
+                           CASE
+                               WHEN state = 'half_open' OR failure_count + 1 >= %(threshold)s
+                               THEN 'open' ELSE state
+                           END AS state
+                    FROM old
+                )
+                UPDATE cartona_circuit_breaker breaker SET
+                    failure_count = new.failure_count,
+                    last_error = %(error)s,
+                    state = new.state,
+                    opened_at = CASE
+                        WHEN new.old_state != 'open' AND new.state = 'open'
+                        THEN now() AT TIME ZONE 'UTC' ELSE breaker.opened_at
+                    END
+                FROM new
+                WHERE breaker.id = new.id
+                RETURNING new.old_state, new.state, new.failure_count
+            """, {
+                'config_id': config.id,
+                'error': error,
+                'threshold': config.circuit_failure_threshold,
+            })
+            row = cr.fetchone()
+        if row and row[0] != 'open' and row[1] == 'open':
+            _logger.warning(
+                'Cartona circuit for config %s open after %s consecutive failures: %s',
+                config.id, row[2], error,
+            )
@@ -1,10 +1,12 @@
 from odoo import models, fields, api, _
 from odoo.exceptions import UserError, ValidationError
+from odoo.tools import SQL
 from odoo.tools.safe_eval import safe_eval
 from datetime import timedelta
 import requests
 import logging
 
+from . import cartona_http
 from .cartona_mixin import CARTONA_AUTH_HEADER
 
 _logger = logging.getLogger(__name__)
@@ -20,6 +22,26 @@ CARTONA_STATE_MAPPING = {
 }
 
 _STATE_MAPPING_FIELDS = frozenset(['enable_custom_state_mapping', 'custom_state_mapping'])
+_PUSH_TARGET_FIELDS = frozenset(['warehouse_id', 'api_base_url', 'auth_token'])
+_HTTP_SESSION_FIELDS = frozenset(['api_base_url', 'auth_token'])
+
+# Per-config sub-channels of the ``cartona`` queue channel
+# (root.cartona.<config id>.<kind>) and the job priority each kind is queued
+# with: when sub-channels compete for the capacity of ``cartona``, lower
+# priorities run first, so order work never waits behind a catalog resync.
+QUEUE_CHANNEL_PRIORITIES = {
+    'orders': 5,
+    'stock': 10,
+    'price': 15,
+    'bulk': 20,
+}
+# Job runner capacity suggested for each sub-channel (see queue_channels_config).
+QUEUE_CHANNEL_CAPACITIES = {
+    'orders': 2,
+    'stock': 1,
+    'price': 1,
+    'bulk': 1,
+}
 
 _PRODUCT_MAPPING_ERROR_CODES = (
     'missing_internal_product_id',
@@ -85,12 +107,158 @@ class CartonaConfig(models.Model):
 
     total_products_synced = fields.Integer(readonly=True, default=0)
     total_orders_pulled = fields.Integer(readonly=True, default=0)
-    last_order_pull = fields.Datetime(readonly=True)
+    last_order_pull = fields.Datetime(
+        readonly=True,
+        help='Watermark of the incremental order pull: end of the last window '
+             'whose pages were all committed.',
+    )
+    last_order_rescan = fields.Datetime(
+        string='Last Order Rescan',
+        readonly=True,
+        help='End of the last 24h deep rescan of Cartona orders.',
+    )
+    order_pull_overlap_minutes = fields.Integer(
+        string='Order Pull Overlap (minutes)',
+        default=10,
+        help='The incremental order pull starts this many minutes before the '
+             'last pull watermark, to catch orders committed late on Cartona.',
+    )
+    rate_limit_per_minute = fields.Integer(
+        string='API Rate Limit (requests/minute)',
+        default=0,
+        help='Requests per minute shared by every worker calling Cartona with '
+             'this configuration. 0 disables the limit; a 429 Retry-After '
+             'from Cartona is honoured either way.',
+    )
+    rate_limit_burst = fields.Integer(
+        string='API Rate Limit Burst',
+        default=10,
+        help='Requests that may be sent back to back after an idle period.',
+    )
+    sellout_fast_path = fields.Boolean(
+        string='Push Sell-outs Immediately',
+        default=True,
+        help='When a stock move takes a variant\'s free quantity in this '
+             'warehouse to the sell-out threshold or below, push it to Cartona '
+             'right after the transaction commits instead of waiting for the '
+             'outbox flush.',
+    )
+    sellout_threshold = fields.Integer(
+        string='Sell-out Threshold',
+        default=0,
+        help='Free quantity at or below which a variant counts as sold out.',
+    )
+    sellout_push_timeout = fields.Integer(
+        string='Sell-out Push Timeout (seconds)',
+        default=5,
+        help='Request timeout of the immediate sell-out push; on failure the '
+             'variants are sent by the regular outbox flush.',
+    )
+    stock_push_min_delta = fields.Integer(
+        string='Min. Stock Change to Push',
+        default=1,
+        help='Push a stock change when it moves the quantity by at least this '
+             'many units since the value Cartona last received.',
+    )
+    stock_push_min_delta_pct = fields.Float(
+        string='Min. Stock Change to Push (%)',
+        default=0.0,
+        help='Also push when the change is at least this percentage of the '
+             'last pushed quantity. 0 disables the percentage rule.',
+    )
+    stock_push_low_band = fields.Integer(
+        string='Low-Stock Band',
+        default=0,
+        help='At or below this quantity (before or after the change) every '
+             'change is pushed exactly. Crossing zero or the sell-out '
+             'threshold is always pushed.',
+    )
+    circuit_failure_threshold = fields.Integer(
+        string='Circuit Breaker Threshold',
+        default=5,
+        help='Consecutive Cartona failures (timeouts, connection errors, 5xx) '
+             'after which calls are paused and new work is parked.',
+    )
+    circuit_reset_seconds = fields.Integer(
+        string='Circuit Breaker Cool-down (seconds)',
+        default=60,
+        help='Time an open circuit waits before letting one probe call through.',
+    )
+    sync_retry_max_attempts = fields.Integer(
+        string='Max. Sync Attempts',
+        default=10,
+        help='Failed pushes of a variant are retried with an exponential '
+             'back-off; after this many attempts the variant is marked Dead '
+             'and no longer retried until its next change or a manual retry.',
+    )
+    sync_retry_base_seconds = fields.Integer(
+        string='Sync Retry Base Delay (seconds)',
+        default=120,
+        help='Delay before the first retry of a failed variant push, doubled '
+             'at each further attempt (capped at 6 hours).',
+    )
+    log_level = fields.Selection([
+        ('errors', 'Errors Only'),
+        ('summary', 'Summary'),
+        ('full', 'Full'),
+    ], string='Sync Log Level', default='summary', required=True,
+        help='Errors Only: only operations with errors or warnings are logged. '
+             'Summary: every operation is logged, but details and payloads '
+             'only for errors and warnings. Full: everything, including the '
+             'request snapshot of each synced variant. Manual actions are '
+             'always logged in full.',
+    )
+    log_success_sample_pct = fields.Float(
+        string='Success Detail Sampling (%)',
+        default=0.0,
+        help='Share of successful automated operations still logged in full '
+             'when the log level is not Full, to keep a sample of normal '
+             'traffic for troubleshooting.',
+    )
+    circuit_state = fields.Selection([
+        ('closed', 'Closed'),
+        ('open', 'Open'),
+        ('half_open', 'Half-Open'),
+    ], string='API Circuit', compute='_compute_circuit_breaker')
+    circuit_failure_count = fields.Integer(
+        string='Consecutive API Failures',
+        compute='_compute_circuit_breaker',
+    )
+    circuit_opened_at = fields.Datetime(
+        string='Circuit Opened At',
+        compute='_compute_circuit_breaker',
+    )
+    circuit_last_error = fields.Text(
+        string='Last API Failure',
+        compute='_compute_circuit_breaker',
+    )
+    http_pool_requests = fields.Integer(
+        string='HTTP Requests',
+        compute='_compute_http_pool_stats',
+        help='Requests sent through this worker process\'s pooled session '
+             'since it was opened (counters are per process).',
+    )
+    http_pool_new_connections = fields.Integer(
+        string='New Connections',
+        compute='_compute_http_pool_stats',
+    )
+    http_pool_reused_connections = fields.Integer(
+        string='Reused Connections',
+        compute='_compute_http_pool_stats',
+    )
+    queue_channels_config = fields.Char(
+        string='Job Runner Channels',
+        compute='_compute_queue_channels_config',
+        help='Capacities of this configuration\'s job sub-channels, to append '
+             'to the [queue_job] channels option of the job runner. Without '
+             'it the sub-channels share the capacity of the cartona channel.',
+    )
     dashboard_issues_refreshed_at = fields.Datetime(readonly=True)
 
     stat_products_synced = fields.Integer(compute='_compute_dashboard_stats', string='Synced Variants')
     stat_products_error = fields.Integer(compute='_compute_dashboard_stats', string='Sync Errors')
     stat_products_pending = fields.Integer(compute='_compute_dashboard_stats', string='Pending Variants')
+    stat_products_dead = fields.Integer(compute='_compute_dashboard_stats', string='Dead Variants')
     stat_orders_cartona = fields.Integer(compute='_compute_dashboard_stats', string='Cartona Orders')
     stat_sync_errors_24h = fields.Integer(compute='_compute_dashboard_stats', string='Issues (24h)')
     stat_pending_jobs = fields.Integer(compute='_compute_dashboard_stats', string='Queued Jobs')
@@ -126,7 +294,15 @@ class CartonaConfig(models.Model):
     def write(self, vals):
         if _STATE_MAPPING_FIELDS.intersection(vals):
             raise UserError(_('Cartona order state mapping is fixed and cannot be changed.'))
-        return super().write(vals)
+        result = super().write(vals)
+        if _PUSH_TARGET_FIELDS.intersection(vals):
+            # Another warehouse or supplier account: what was last pushed no
+            # longer says anything about what Cartona holds for this config.
+            self.env['cartona.product.sync'].sudo().forget_pushed_values(self)
+        if _HTTP_SESSION_FIELDS.intersection(vals):
+            for config in self:
+                cartona_http.drop_session(self.env.cr.dbname, config.id)
+        return result
 
     @api.constrains('api_base_url')
     def _check_api_base_url(self):
@@ -142,9 +318,117 @@ class CartonaConfig(models.Model):
             if record.batch_size < 1 or record.batch_size > 1000:
                 raise ValidationError(_('Batch size must be between 1 and 1000'))
 
+    @api.constrains('order_pull_overlap_minutes')
+    def _check_order_pull_overlap(self):
+        for record in self:
+            if record.order_pull_overlap_minutes < 0:
+                raise ValidationError(_('Order pull overlap cannot be negative'))
+
+    @api.constrains('rate_limit_per_minute', 'rate_limit_burst')
+    def _check_rate_limit(self):
+        for record in self:
+            if record.rate_limit_per_minute < 0:
+                raise ValidationError(_('API rate limit cannot be negative'))
+            if record.rate_limit_burst < 1:
+                raise ValidationError(_('API rate limit burst must be at least 1'))
+
+    @api.constrains('sellout_threshold', 'sellout_push_timeout')
+    def _check_sellout_fast_path(self):
+        for record in self:
+            if record.sellout_threshold < 0:
+                raise ValidationError(_('Sell-out threshold cannot be negative'))
+            if record.sellout_push_timeout < 1:
+                raise ValidationError(_('Sell-out push timeout must be at least 1 second'))
+
+    @api.constrains('stock_push_min_delta', 'stock_push_min_delta_pct', 'stock_push_low_band')
+    def _check_stock_push_significance(self):
+        for record in self:
+            if record.stock_push_min_delta < 1:
+                raise ValidationError(_('Minimum stock change to push must be at least 1'))
+            if record.stock_push_min_delta_pct < 0:
+                raise ValidationError(_('Minimum stock change percentage cannot be negative'))
+            if record.stock_push_low_band < 0:
+                raise ValidationError(_('Low-stock band cannot be negative'))
+
+    def _is_significant_stock_change(self, old_qty, new_qty):
+        """Whether moving Cartona's stock from ``old_qty`` to ``new_qty`` is
+        worth a push under this config's significance rules."""
+        self.ensure_one()
+        delta = abs(new_qty - old_qty)
+        if not delta:
+            return False
+        band = self.stock_push_low_band
+        if self.sellout_fast_path:
+            band = max(band, self.sellout_threshold)
+        if min(old_qty, new_qty) <= band:
+            return True
+        if delta >= self.stock_push_min_delta:
+            return True
+        return bool(
+            self.stock_push_min_delta_pct
+            and delta * 100.0 >= self.stock_push_min_delta_pct * old_qty
+        )
+
+    @api.constrains('sync_retry_max_attempts', 'sync_retry_base_seconds')
+    def _check_sync_retry(self):
+        for record in self:
+            if record.sync_retry_max_attempts < 1:
+                raise ValidationError(_('Max. sync attempts must be at least 1'))
+            if record.sync_retry_base_seconds < 1:
+                raise ValidationError(_('Sync retry base delay must be at least 1 second'))
+
+    @api.constrains('log_success_sample_pct')
+    def _check_log_success_sample_pct(self):
+        for record in self:
+            if not 0 <= record.log_success_sample_pct <= 100:
+                raise ValidationError(_('Success detail sampling must be between 0 and 100%'))
+
+    @api.constrains('circuit_failure_threshold', 'circuit_reset_seconds')
+    def _check_circuit_breaker(self):
+        for record in self:
+            if record.circuit_failure_threshold < 1:
+                raise ValidationError(_('Circuit breaker threshold must be at least 1'))
+            if record.circuit_reset_seconds < 1:
+                raise ValidationError(_('Circuit breaker cool-down must be at least 1 second'))
+
+    def _compute_circuit_breaker(self):
+        breakers = self.env['cartona.circuit.breaker'].sudo().search([
+            ('cartona_config_id', 'in', self.ids),
+        ])
+        by_config = {breaker.cartona_config_id.id: breaker for breaker in breakers}
+        for config in self:
+            breaker = by_config.get(config.id)
+            config.circuit_state = breaker.state if breaker else 'closed'
+            config.circuit_failure_count = breaker.failure_count if breaker else 0
+            config.circuit_opened_at = breaker.opened_at if breaker else False
+            config.circuit_last_error = breaker.last_error if breaker else False
+
+    def _compute_http_pool_stats(self):
+        for config in self:
+            stats = config._http_pool_stats() if config.id else {}
+            config.http_pool_requests = stats.get('requests', 0)
+            config.http_pool_new_connections = stats.get('new_connections', 0)
+            config.http_pool_reused_connections = stats.get('reused_connections', 0)
+
+    def _compute_queue_channels_config(self):
+        for config in self:
+            if not config.id:
+                config.queue_channels_config = False
+                continue
+            channels = [f'cartona.{config.id}:{sum(QUEUE_CHANNEL_CAPACITIES.values())}']
+            channels += [
+                f'cartona.{config.id}.{kind}:{capacity}'
+                for kind, capacity in QUEUE_CHANNEL_CAPACITIES.items()
+            ]
+            config.queue_channels_config = ','.join(channels)
+
     @api.model_create_multi
     def create(self, vals_list):
-        return super().create(vals_list)
+        configs = super().create(vals_list)
+        configs._ensure_queue_channels()
+        self.env['cartona.rate.limit']._create_for_configs(configs)
+        self.env['cartona.circuit.breaker']._create_for_configs(configs)
+        return configs
 
     def copy(self, default=None):
         raise UserError(_('Cartona configuration cannot be duplicated.'))
@@ -163,7 +447,62 @@ class CartonaConfig(models.Model):
                     'Cannot delete Cartona configuration for warehouse %s: '
                     'Cartona orders are still linked to it.',
                 ) % config.warehouse_id.display_name)
-        return super().unlink()
+        channels = self.env['queue.job.channel'].sudo()
+        for config in self:
+            cartona_http.drop_session(self.env.cr.dbname, config.id)
+            config_channel = config._queue_config_channel()
+            if config_channel:
+                channels |= config_channel.search([('parent_id', '=', config_channel.id)])
+                channels |= config_channel
+        # The log tables are partitioned, without foreign key to cascade from.
+        self.env['cartona.sync.log'].sudo().delete_for_configs(self.ids)
+        result = super().unlink()
+        # Children before their parent: parent_id is ondelete='restrict'.
+        channels.sorted(lambda channel: -len(channel.complete_name)).unlink()
+        return result
+
+    def _queue_channel(self, kind):
+        """Complete name of this config's queue sub-channel for ``kind``."""
+        self.ensure_one()
+        return f'root.cartona.{self.id}.{kind}'
+
+    def _queue_job_options(self, kind):
+        """with_delay() routing options for a job of ``kind`` on this config."""
+        self.ensure_one()
+        return {
+            'channel': self._queue_channel(kind),
+            'priority': QUEUE_CHANNEL_PRIORITIES[kind],
+        }
+
+    def _queue_config_channel(self):
+        self.ensure_one()
+        return self.env['queue.job.channel'].sudo().search([
+            ('complete_name', '=', f'root.cartona.{self.id}'),
+        ], limit=1)
+
+    def _ensure_queue_channels(self):
+        """Create root.cartona.<id> and its per-kind sub-channels if missing."""
+        channel_model = self.env['queue.job.channel'].sudo()
+        parent = self.env.ref('cartona_odoo.queue_job_channel_cartona', raise_if_not_found=False)
+        if not parent:
+            return
+        for config in self:
+            config_channel = config._queue_config_channel() or channel_model.create({
+                'name': str(config.id),
+                'parent_id': parent.id,
+            })
+            existing = set(channel_model.search([
+                ('parent_id', '=', config_channel.id),
+            ]).mapped('name'))
+            channel_model.create([
+                {'name': kind, 'parent_id': config_channel.id}
+                for kind in QUEUE_CHANNEL_PRIORITIES
+                if kind not in existing
+            ])
+
+    @api.model
+    def _ensure_all_queue_channels(self):
+        self.search([])._ensure_queue_channels()
 
     @api.model
     def get_for_warehouse(self, warehouse):
@@ -210,6 +549,11 @@ class CartonaConfig(models.Model):
                 allowed |= job
         return allowed
 
+    def _http_pool_stats(self):
+        """Keep-alive reuse counters of this process's HTTP session for the config."""
+        self.ensure_one()
+        return cartona_http.session_stats(self.env.cr.dbname, self.id)
+
     def get_api_headers(self):
         self.ensure_one()
         return {
@@ -245,19 +589,37 @@ class CartonaConfig(models.Model):
         sync_model = self.env['cartona.product.sync']
         pivot_pending = sync_model.search_count(
             self._dashboard_sync_domain([
-                ('sync_status', 'in', ['not_synced', 'syncing']),
+                ('sync_status', 'in', ['not_synced', 'syncing', 'deferred']),
             ]),
         )
-        has_pivot_product_ids = sync_model.search(
-            self._dashboard_sync_domain(),
-        ).mapped('product_id').ids
-        no_row_pending = self.env['product.product'].search_count(
-            self._dashboard_eligible_product_domain() + [
-                ('id', 'not in', has_pivot_product_ids),
-            ],
-        )
+        query = self._search_eligible_products_without_sync()
+        [(no_row_pending,)] = self.env.execute_query(query.select(SQL('COUNT(*)')))
         return pivot_pending + no_row_pending
 
+    def _search_eligible_products_without_sync(self, limit=None, order=None):
+        """Query of the eligible variants that have no cartona.product.sync row
+        for this config yet.
+
+        Written as a NOT EXISTS anti-join (served by the (cartona_config_id,
+        sync_status, product_id) index) rather than a ``not in`` of every
+        synced id, so its cost does not grow with the size of the catalog.
+        """
+        self.ensure_one()
+        product_model = self.env['product.product'].with_company(self.company_id)
+        self.env['cartona.product.sync'].flush_model(['product_id', 'cartona_config_id'])
+        query = product_model._search(
+            self._dashboard_eligible_product_domain(), limit=limit, order=order,
+        )
+        query.add_where(SQL(
+            """NOT EXISTS (
+                SELECT 1 FROM cartona_product_sync sync
+                WHERE sync.cartona_config_id = %s AND sync.product_id = %s
+            )""",
+            self.id,
+            SQL.identifier(query.table, 'id'),
+        ))
+        return query
+
     @api.depends(
         'is_cartona_sync_enabled', 'connection_status', 'last_order_pull',
         'last_sync_date', 'total_products_synced', 'total_orders_pulled',
@@ -277,6 +639,9 @@ class CartonaConfig(models.Model):
                 config._dashboard_sync_domain([('sync_status', '=', 'error')]),
             )
             config.stat_products_pending = config._count_pending_variants()
+            config.stat_products_dead = sync_model.search_count(
+                config._dashboard_sync_domain([('sync_status', '=', 'dead')]),
+            )
             config.stat_orders_cartona = order_model.search_count([
                 ('is_cartona_order', '=', True),
                 ('cartona_config_id', '=', config.id),
@@ -495,8 +860,11 @@ class CartonaConfig(models.Model):
     def action_view_products_error(self):
         return self._action_view_sync_by_status('error')
 
+    def action_view_products_dead(self):
+        return self._action_view_sync_by_status('dead')
+
     def action_view_products_pending(self):
-        return self._action_view_sync_by_status(['not_synced', 'syncing'])
+        return self._action_view_sync_by_status(['not_synced', 'syncing', 'deferred'])
 
     def _action_view_sync_by_status(self, status):
         self.ensure_one()
@@ -510,6 +878,7 @@ class CartonaConfig(models.Model):
                 'error': _('Variants With Sync Errors'),
                 'not_synced': _('Unsynced Variants'),
                 'syncing': _('Variants Syncing'),
+                'dead': _('Dead Variants'),
             }
             name = names.get(status, _('Variants'))
         return {
@@ -561,13 +930,16 @@ class CartonaConfig(models.Model):
         self.ensure_one()
         test_url = f'{self.api_base_url.rstrip("/")}/supplier-product'
         try:
-            response = requests.get(
+            response = cartona_http.get_session(self).request(
+                'GET',
                 test_url,
                 headers=self.get_api_headers(),
                 timeout=self.timeout,
                 params={'page': 1, 'per_page': 1},
             )
             if response.status_code == 200:
+                # A successful manual test is as good as a probe.
+                self.env['cartona.circuit.breaker'].sudo().record_success(self)
                 self.write({
                     'connection_status': 'connected',
                     'error_message': False,
@@ -634,7 +1006,9 @@ class CartonaConfig(models.Model):
             cartona_config_id=self.id,
             cartona_log_action_type='manual',
         )
-        result = api.pull_and_process_orders()
+        # A manual pull is the operator's safety net: re-read the full 24h
+        # window rather than just the increment since the watermark.
+        result = api.pull_and_process_orders(deep_rescan=True)
         self._update_sync_stats()
         self._refresh_dashboard_issues_if_stale(force=True)
         return {
@@ -647,7 +1021,7 @@ class CartonaConfig(models.Model):
             },
         }
 
-    def manual_sync_all_variants(self):
+    def manual_sync_all_variants(self, force=False):
         self.ensure_one()
         if not self.is_cartona_sync_enabled:
             raise UserError(_('Enable Cartona sync on configuration first.'))
@@ -660,11 +1034,11 @@ class CartonaConfig(models.Model):
                 'No saleable product variants found for %s.',
             ) % company.display_name)
         self.with_delay(
-            channel='cartona',
+            **self._queue_job_options('bulk'),
             description=_(
                 'Sync all saleable variants to Cartona [%s]',
             ) % self.warehouse_id.name,
-        ).sync_all_variants_job()
+        ).sync_all_variants_job(force=force)
         return {
             'type': 'ir.actions.client',
             'tag': 'display_notification',
@@ -678,7 +1052,11 @@ class CartonaConfig(models.Model):
             },
         }
 
-    def sync_all_variants_job(self):
+    def action_force_sync_all_variants(self):
+        """Full resync: push every variant even if Cartona already has its values."""
+        return self.manual_sync_all_variants(force=True)
+
+    def sync_all_variants_job(self, force=False):
         """Queue job entrypoint: restore config context then run bulk sync."""
         self.ensure_one()
         if not self.is_cartona_sync_enabled:
@@ -687,7 +1065,43 @@ class CartonaConfig(models.Model):
             cartona_config_id=self.id,
             cartona_warehouse_id=self.warehouse_id.id,
             cartona_log_action_type='manual',
-        ).sync_all_variants()
+        ).sync_all_variants(force=force)
+
+    def _enqueue_catalog_reconciliation(self, action_type='automated'):
+        self.ensure_one()
+        self.env['cartona.api'].with_delay(
+            **self._queue_job_options('bulk'),
+            description=_('Reconcile Cartona catalog [%s]') % self.warehouse_id.name,
+        ).reconcile_catalog_job(self.id, action_type=action_type)
+
+    def action_reconcile_catalog(self):
+        self.ensure_one()
+        if not self.is_cartona_sync_enabled:
+            raise UserError(_('Enable Cartona sync on configuration first.'))
+        self._enqueue_catalog_reconciliation(action_type='manual')
+        return {
+            'type': 'ir.actions.client',
+            'tag': 'display_notification',
+            'params': {
+                'title': _('Reconciliation Queued'),
+                'message': _(
+                    'The Cartona catalog of %s will be compared with Odoo and '
+                    'drifted variants corrected. See Drift Reports for the outcome.'
+                ) % self.warehouse_id.name,
+                'type': 'info',
+            },
+        }
+
+    def action_view_drift_reports(self):
+        self.ensure_one()
+        return {
+            'type': 'ir.actions.act_window',
+            'name': _('Drift Reports'),
+            'res_model': 'cartona.drift.report',
+            'view_mode': 'list,form',
+            'domain': [('cartona_config_id', '=', self.id)],
+            'context': {'default_cartona_config_id': self.id},
+        }
 
     def action_view_synced_variants(self):
         return self._action_view_sync_by_status('synced')
@@ -0,0 +1,82 @@
+from odoo import models, fields, _
+
+# Counters of a report, in display order; reconcile pages add to them.
+DRIFT_COUNTERS = (
+    'items_scanned',
+    'in_sync_count',
+    'price_mismatch_count',
+    'stock_mismatch_count',
+    'unlimited_mismatch_count',
+    'unmapped_count',
+    'pushed_count',
+    'push_error_count',
+)
+
+
+class CartonaDriftReport(models.Model):
+    """Outcome of one catalog reconciliation run against ``GET supplier-product``.
+
+    A running report is resumed by the next reconciliation job of its config
+    (after a postponed or killed run) from the page after ``pages_scanned``.
+    """
+    _name = 'cartona.drift.report'
+    _description = 'Cartona Catalog Drift Report'
+    _order = 'id desc'
+
+    cartona_config_id = fields.Many2one(
+        'cartona.config',
+        required=True,
+        ondelete='cascade',
+        index=True,
+    )
+    company_id = fields.Many2one(
+        'res.company',
+        related='cartona_config_id.company_id',
+        store=True,
+        index=True,
+    )
+    state = fields.Selection([
+        ('running', 'Running'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+    ], default='running', required=True, readonly=True)
+    date_start = fields.Datetime(default=fields.Datetime.now, readonly=True)
+    date_end = fields.Datetime(readonly=True)
+    pages_scanned = fields.Integer(readonly=True)
+    items_scanned = fields.Integer(string='Cartona Items', readonly=True)
+    in_sync_count = fields.Integer(string='In Sync', readonly=True)
+    price_mismatch_count = fields.Integer(string='Price Drift', readonly=True)
+    stock_mismatch_count = fields.Integer(string='Stock Drift', readonly=True)
+    unlimited_mismatch_count = fields.Integer(string='Unlimited Flag Drift', readonly=True)
+    unmapped_count = fields.Integer(
+        string='Unmapped',
+        readonly=True,
+        help='Cartona items whose internal_product_id is empty or not an '
+             'eligible variant of this configuration.',
+    )
+    pushed_count = fields.Integer(string='Corrected', readonly=True)
+    push_error_count = fields.Integer(string='Correction Errors', readonly=True)
+    error_message = fields.Text(readonly=True)
+
+    def add_page(self, page, counters):
+        self.ensure_one()
+        vals = {name: self[name] + counters.get(name, 0) for name in DRIFT_COUNTERS}
+        vals['pages_scanned'] = page
+        self.write(vals)
+
+    def summary(self):
+        self.ensure_one()
+        return _(
+            'Catalog reconciliation: %(items)s Cartona items, %(in_sync)s in sync, '
+            'drift price %(price)s / stock %(stock)s / unlimited %(unlimited)s, '
+            '%(unmapped)s unmapped, %(pushed)s corrected, %(errors)s failed'
+        ) % {
+            'items': self.items_scanned,
+            'in_sync': self.in_sync_count,
+            'price': self.price_mismatch_count,
+            'stock': self.stock_mismatch_count,
+            'unlimited': self.unlimited_mismatch_count,
+            'unmapped': self.unmapped_count,
+            'pushed': self.pushed_count,
+            'errors': self.push_error_count,
+        }
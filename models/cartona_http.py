@@ -0,0 +1,128 @@
+"""Per-process pool of keep-alive HTTP sessions, one per Cartona config.
+
+Every worker process/thread talking to Cartona reuses the same
+``requests.Session`` for a given (database, config), so consecutive jobs on
+the ``cartona`` channel ride an already-open TLS connection instead of paying
+a fresh TCP + TLS handshake each time.
+
+A session is keyed on the config's URL and token: when either changes (in
+this process or any other), the next request notices the new fingerprint and
+replaces the session. ``drop_session`` does the same eagerly from
+cartona.config write/unlink.
+"""
+import hashlib
+import logging
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+_logger = logging.getLogger(__name__)
+
+# Distinct hosts kept per session (normally just the one supplier-integrations host).
+HTTP_POOL_CONNECTIONS = 4
+# Idle keep-alive connections kept per host: sized for the cartona channel's
+# concurrency within one process, extra concurrent requests still go through
+# on a throwaway connection (pool_block=False).
+HTTP_POOL_MAXSIZE = 16
+# Log reuse counters every N requests per session.
+HTTP_STATS_LOG_EVERY = 500
+
+_lock = threading.Lock()
+_sessions = {}
+
+
+def _fingerprint(config):
+    token = config.sudo().auth_token or ''
+    return (config.api_base_url, hashlib.sha256(token.encode()).hexdigest())
+
+
+class PooledSession:
+    def __init__(self, db_name, config_id, fingerprint):
+        self.db_name = db_name
+        self.config_id = config_id
+        self.fingerprint = fingerprint
+        self.session = requests.Session()
+        # Only connect errors are retried: the request never left, so this is
+        # safe for POSTs too, and it covers a keep-alive connection the server
+        # closed while it sat idle in the pool. Read errors/statuses are not
+        # retried here - callers decide what a failed call means.
+        self.adapter = HTTPAdapter(
+            pool_connections=HTTP_POOL_CONNECTIONS,
+            pool_maxsize=HTTP_POOL_MAXSIZE,
+            max_retries=Retry(
+                total=2, connect=2, read=0, status=0, other=0,
+                backoff_factor=0.1, raise_on_status=False,
+            ),
+        )
+        self.session.mount('https://', self.adapter)
+        self.session.mount('http://', self.adapter)
+        self.request_count = 0
+
+    def new_connection_count(self):
+        pools = self.adapter.poolmanager.pools
+        total = 0
+        for key in list(pools.keys()):
+            pool = pools.get(key)
+            if pool is not None:
+                total += pool.num_connections
+        return total
+
+    def stats(self):
+        new_connections = self.new_connection_count()
+        return {
+            'requests': self.request_count,
+            'new_connections': new_connections,
+            'reused_connections': max(self.request_count - new_connections, 0),
+        }
+
+    def request(self, method, url, **kwargs):
+        try:
+            return self.session.request(method, url, **kwargs)
+        finally:
+            with _lock:
+                self.request_count += 1
+                log_stats = not self.request_count % HTTP_STATS_LOG_EVERY
+            if log_stats:
+                stats = self.stats()
+                _logger.info(
+                    'Cartona HTTP pool [db %s, config %s]: %s requests, '
+                    '%s new connections, %s reused',
+                    self.db_name, self.config_id, stats['requests'],
+                    stats['new_connections'], stats['reused_connections'],
+                )
+
+    def close(self):
+        self.session.close()
+
+
+def get_session(config):
+    """Return the pooled session of ``config`` for this process."""
+    key = (config.env.cr.dbname, config.id)
+    fingerprint = _fingerprint(config)
+    stale = None
+    with _lock:
+        pooled = _sessions.get(key)
+        if pooled is None or pooled.fingerprint != fingerprint:
+            stale = pooled
+            pooled = _sessions[key] = PooledSession(key[0], config.id, fingerprint)
+    if stale is not None:
+        stale.close()
+    return pooled
+
+
+def drop_session(db_name, config_id):
+    with _lock:
+        pooled = _sessions.pop((db_name, config_id), None)
+    if pooled is not None:
+        pooled.close()
+
+
+def session_stats(db_name, config_id):
+    """Reuse counters of this process's session for a config (zeros if none yet)."""
+    with _lock:
+        pooled = _sessions.get((db_name, config_id))
+    if pooled is None:
+        return {'requests': 0, 'new_connections': 0, 'reused_connections': 0}
+    return pooled.stats()
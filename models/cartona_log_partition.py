@@ -0,0 +1,215 @@
+"""Monthly range partitions of the sync log tables.
+
+``cartona_sync_log`` and ``cartona_sync_log_line`` are partitioned by
+``create_date`` (a log and its lines are created in the same transaction, so
+they share ``create_date`` and land in the same month). Each month gets a
+``<table>_pYYYYMM`` partition, created ahead of time by a daily cron; a
+``<table>_default`` partition catches anything outside them. Retention then
+detaches and drops whole months instead of deleting rows.
+
+On conversion, the existing table is not copied: it is attached as-is as
+``<table>_legacy``, covering everything up to the end of the current month,
+and dropped by retention like any other partition once it has expired.
+
+Postgres requires the partition key in the primary key, so the tables get
+``PRIMARY KEY (id, create_date)``. Odoo does not create foreign keys to or
+from partitioned tables, so the cascades those tables relied on are done in
+code (cartona.sync.log unlink, cartona.config unlink, drop_expired_partitions).
+
+Everything here works on a bare cursor so it can run from migrations.
+"""
+import logging
+import re
+from datetime import date, datetime
+
+_logger = logging.getLogger(__name__)
+
+# Parent table first: lines are dropped before their logs.
+PARTITIONED_TABLES = ('cartona_sync_log', 'cartona_sync_log_line')
+PARTITION_MONTHS_AHEAD = 3
+# many2many tables of cartona.config pointing at log rows, cleaned when
+# partitions are dropped since they have no foreign key to them any more.
+LOG_REFERENCES = (
+    ('cartona_config_recent_sync_rel', 'log_id', 'cartona_sync_log'),
+    ('cartona_config_product_mapping_rel', 'line_id', 'cartona_sync_log_line'),
+)
+
+_BOUND_RE = re.compile(r"FROM \((.+?)\) TO \((.+?)\)")
+
+
+def _month_start(day, offset=0):
+    month = day.month - 1 + offset
+    return date(day.year + month // 12, month % 12 + 1, 1)
+
+
+def _parse_bound(value):
+    if value in ('MINVALUE', 'MAXVALUE'):
+        return None
+    return datetime.fromisoformat(value.strip("'")).date()
+
+
+def is_partitioned(cr, table):
+    cr.execute("SELECT relkind FROM pg_class WHERE relname = %s", (table,))
+    row = cr.fetchone()
+    return bool(row) and row[0] == 'p'
+
+
+def _partitions(cr, table):
+    """[(name, from, to)] of ``table``; from/to are None when unbounded,
+    and both are None for the default partition."""
+    cr.execute("""
+        SELECT child.relname, pg_get_expr(child.relpartbound, child.oid)
+        FROM pg_inherits
+        JOIN pg_class parent ON parent.oid = pg_inherits.inhparent
+        JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+        WHERE parent.relname = %s
+    """, (table,))
+    partitions = []
+    for name, bound in cr.fetchall():
+        match = _BOUND_RE.search(bound)
+        if match:
+            partitions.append((name, _parse_bound(match[1]), _parse_bound(match[2])))
+        else:
+            partitions.append((name, None, None))
+    return partitions
+
+
+def _columns(cr, table):
+    cr.execute("""
+        SELECT column_name FROM information_schema.columns
+        WHERE table_name = %s ORDER BY ordinal_position
+    """, (table,))
+    return [row[0] for row in cr.fetchall()]
+
+
+def partition_tables(cr):
+    """Convert the log tables to partitioned tables (no-op once done)."""
+    today = datetime.utcnow().date()
+    legacy_until = _month_start(today, 1)
+    for table in PARTITIONED_TABLES:
+        if is_partitioned(cr, table):
+            continue
+        _partition_table(cr, table, legacy_until)
+    ensure_partitions(cr)
+
+
+def _partition_table(cr, table, legacy_until):
+    legacy = f'{table}_legacy'
+    _logger.info('Cartona: converting %s to a partitioned table', table)
+    cr.execute("""
+        SELECT indexname, indexdef FROM pg_indexes
+        WHERE tablename = %s AND indexname != %s
+    """, (table, f'{table}_pkey'))
+    indexes = cr.fetchall()
+    cr.execute("""
+        SELECT conrelid::regclass::text, conname FROM pg_constraint
+        WHERE contype = 'f'
+          AND (conrelid = %s::regclass OR confrelid = %s::regclass)
+    """, (table, table))
+    for fk_table, fk_name in cr.fetchall():
+        cr.execute(f'ALTER TABLE {fk_table} DROP CONSTRAINT "{fk_name}"')
+
+    cr.execute(f"ALTER TABLE {table} RENAME TO {legacy}")
+    cr.execute(f"ALTER TABLE {legacy} RENAME CONSTRAINT {table}_pkey TO {legacy}_pkey")
+    for position, (index_name, _indexdef) in enumerate(indexes):
+        cr.execute(f'ALTER INDEX "{index_name}" RENAME TO {legacy}_idx{position}')
+    cr.execute(f"""
+        UPDATE {legacy}
+        SET create_date = COALESCE(write_date, now() AT TIME ZONE 'UTC')
+        WHERE create_date IS NULL
+    """)
+    cr.execute(f"ALTER TABLE {legacy} ALTER COLUMN create_date SET NOT NULL")
+
+    cr.execute(f"""
+        CREATE TABLE {table} (LIKE {legacy} INCLUDING DEFAULTS)
+        PARTITION BY RANGE (create_date)
+    """)
+    cr.execute(f"ALTER TABLE {table} ADD CONSTRAINT {table}_pkey PRIMARY KEY (id, create_date)")
+    cr.execute(f"ALTER SEQUENCE {table}_id_seq OWNED BY {table}.id")
+    cr.execute(f"""
+        ALTER TABLE {table} ATTACH PARTITION {legacy}
+        FOR VALUES FROM (MINVALUE) TO (%s)
+    """, (legacy_until,))
+    # Same definitions and names as before on the parent: Postgres adopts
+    # the equivalent legacy index instead of building it again.
+    for index_name, indexdef in indexes:
+        if indexdef.startswith('CREATE UNIQUE'):
+            _logger.warning('Cartona: unique index %s cannot be partitioned, dropped', index_name)
+            continue
+        cr.execute(indexdef)
+    cr.execute(f"CREATE TABLE {table}_default PARTITION OF {table} DEFAULT")
+    _logger.info('Cartona: %s partitioned, existing rows kept in %s', table, legacy)
+
+
+def ensure_partitions(cr, months_ahead=PARTITION_MONTHS_AHEAD):
+    """Create the monthly partitions from the current month to
+    ``months_ahead`` months ahead. Returns the names of those created."""
+    today = datetime.utcnow().date()
+    created = []
+    for table in PARTITIONED_TABLES:
+        if not is_partitioned(cr, table):
+            continue
+        ranges = [(start, end) for _name, start, end in _partitions(cr, table)
+                  if start or end]
+        for offset in range(months_ahead + 1):
+            start, end = _month_start(today, offset), _month_start(today, offset + 1)
+            if any((low is None or low <= start) and (high is None or start < high)
+                   for low, high in ranges):
+                continue
+            name = f'{table}_p{start:%Y%m}'
+            _create_partition(cr, table, name, start, end)
+            ranges.append((start, end))
+            created.append(name)
+    if created:
+        _logger.info('Cartona: created log partitions %s', ', '.join(created))
+    return created
+
+
+def _create_partition(cr, table, name, start, end):
+    default = f'{table}_default'
+    cr.execute(f"""
+        SELECT 1 FROM {default} WHERE create_date >= %s AND create_date < %s LIMIT 1
+    """, (start, end))
+    if not cr.fetchone():
+        cr.execute(f"""
+            CREATE TABLE {name} PARTITION OF {table} FOR VALUES FROM (%s) TO (%s)
+        """, (start, end))
+        return
+    # Attaching a range the default partition already holds rows of would
+    # fail: move those rows into the new table first.
+    columns = ', '.join(f'"{column}"' for column in _columns(cr, table))
+    cr.execute(f"CREATE TABLE {name} (LIKE {table} INCLUDING DEFAULTS)")
+    cr.execute(f"""
+        WITH moved AS (
+            DELETE FROM {default} WHERE create_date >= %s AND create_date < %s
+            RETURNING {columns}
+        )
+        INSERT INTO {name} ({columns}) SELECT {columns} FROM moved
+    """, (start, end))
+    cr.execute(f"""
+        ALTER TABLE {table} ATTACH PARTITION {name} FOR VALUES FROM (%s) TO (%s)
+    """, (start, end))
+
+
+def drop_expired_partitions(cr, cutoff):
+    """Detach and drop the partitions holding only rows created before
+    ``cutoff`` (a datetime). Returns the names of the dropped partitions."""
+    cutoff = cutoff.date() if isinstance(cutoff, datetime) else cutoff
+    dropped = []
+    for table in reversed(PARTITIONED_TABLES):
+        if not is_partitioned(cr, table):
+            continue
+        for name, _start, end in _partitions(cr, table):
+            if end is None or end > cutoff:
+                continue
+            cr.execute(f"ALTER TABLE {table} DETACH PARTITION {name}")
+            cr.execute(f"DROP TABLE {name}")
+            dropped.append(name)
+    if dropped:
+        for rel_table, column, target in LOG_REFERENCES:
+            cr.execute(f"""
+                DELETE FROM {rel_table} rel
+                WHERE NOT EXISTS (SELECT 1 FROM {target} t WHERE t.id = rel.{column})
+            """)
+        _logger.info('Cartona: dropped expired log partitions %s', ', '.join(dropped))
+    return dropped
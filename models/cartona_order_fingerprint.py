@@ -0,0 +1,95 @@
+from odoo import models, fields, api
+import hashlib
+import json
+
+
+class CartonaOrderFingerprint(models.Model):
+    _name = 'cartona.order.fingerprint'
+    _description = 'Cartona Inbound Order Fingerprint (per order and config)'
+    _order = 'id'
+
+    _sql_constraints = [
+        (
+            'config_cartona_id_uniq',
+            'unique(cartona_config_id, cartona_id)',
+            'Only one fingerprint per Cartona order and configuration.',
+        ),
+    ]
+
+    cartona_config_id = fields.Many2one(
+        'cartona.config',
+        required=True,
+        ondelete='cascade',
+    )
+    company_id = fields.Many2one(
+        'res.company',
+        related='cartona_config_id.company_id',
+        store=True,
+        index=True,
+    )
+    cartona_id = fields.Char(string='External Order ID', required=True)
+    fingerprint = fields.Char(required=True)
+
+    @api.model
+    def compute_fingerprint(self, order_data):
+        """Hash of the parts of a pulled order the processor acts on."""
+        return hashlib.sha1(json.dumps(
+            {
+                'status': order_data.get('status'),
+                'order_details': order_data.get('order_details'),
+            },
+            sort_keys=True, ensure_ascii=False, default=str,
+        ).encode()).hexdigest()
+
+    @api.model
+    def split_unchanged(self, config, orders_data):
+        """Split one pulled page into (changed, unchanged) orders.
+
+        One query for the whole page; an order is unchanged when its stored
+        fingerprint matches the payload's. Returns the changed orders as
+        (order_data, fingerprint) pairs so the caller can remember them once
+        processed, and the count of unchanged orders.
+        """
+        hashed = []
+        for order_data in orders_data:
+            cartona_id = order_data.get('hashed_id') if isinstance(order_data, dict) else None
+            fingerprint = self.compute_fingerprint(order_data) if cartona_id else None
+            hashed.append((order_data, cartona_id, fingerprint))
+        cartona_ids = [cartona_id for _data, cartona_id, _fp in hashed if cartona_id]
+        known = {}
+        if cartona_ids:
+            self.env.cr.execute("""
+                SELECT cartona_id, fingerprint FROM cartona_order_fingerprint
+                WHERE cartona_config_id = %s AND cartona_id = ANY(%s)
+            """, (config.id, cartona_ids))
+            known = dict(self.env.cr.fetchall())
+        changed = []
+        unchanged = 0
+        for order_data, cartona_id, fingerprint in hashed:
+            if cartona_id and known.get(cartona_id) == fingerprint:
+                unchanged += 1
+            else:
+                changed.append((order_data, fingerprint))
+        return changed, unchanged
+
+    @api.model
+    def remember(self, config, fingerprints):
+        """Upsert ``{cartona_id: fingerprint}`` for orders fully processed."""
+        if not fingerprints:
+            return
+        cartona_ids, values = zip(*fingerprints.items())
+        self.env.cr.execute("""
+            INSERT INTO cartona_order_fingerprint
+                (cartona_config_id, company_id, cartona_id, fingerprint,
+                 create_date, write_date, create_uid, write_uid)
+            SELECT %(config_id)s, %(company_id)s, c, f, now(), now(), %(uid)s, %(uid)s
+            FROM unnest(%(cartona_ids)s, %(fingerprints)s) AS t(c, f)
+            ON CONFLICT (cartona_config_id, cartona_id)
+            DO UPDATE SET fingerprint = EXCLUDED.fingerprint, write_date = now()
+        """, {
+            'config_id': config.id,
+            'company_id': config.company_id.id,
+            'uid': self.env.uid,
+            'cartona_ids': list(cartona_ids),
+            'fingerprints': list(values),
+        })
@@ -100,24 +100,100 @@ class CartonaOrderProcessor(models.Model):
                 order.name, err,
             )
 
-    def process_cartona_order(self, order_data):
+    def _retailer_code(self, retailer_data, retailer_name):
+        return (
+            retailer_data.get('retailer_code')
+            or retailer_data.get('id')
+            or retailer_data.get('retailer_id')
+            or str(hash(retailer_name))[:8]
+        )
+
+    def _retailer_name(self, retailer_data):
+        return (
+            retailer_data.get('retailer_name')
+            or retailer_data.get('name')
+            or 'Cartona Customer'
+        )
+
+    def prefetch_order_page(self, orders_data, config):
+        """Resolve everything a page of orders will look up, one query per kind.
+
+        Collects the page's hashed_ids, internal_product_ids and retailer
+        external ids up front and returns them as maps that
+        process_cartona_order(..., prefetch=...) threads down into
+        validation and creation instead of searching per order/line:
+
+        - ``orders``: hashed_id -> existing sale.order of this config
+        - ``variants``: variant id -> product.product (existing ids only)
+        - ``partners``: retailer external id -> res.partner of this config
+        """
+        order_ids, variant_ids, partner_ext_ids = set(), set(), set()
+        for order_data in orders_data:
+            if isinstance(order_data, list):
+                order_data = order_data[0] if order_data else {}
+            if not isinstance(order_data, dict):
+                continue
+            if order_data.get('hashed_id'):
+                order_ids.add(order_data['hashed_id'])
+            retailer_data = order_data.get('retailer')
+            if isinstance(retailer_data, dict):
+                retailer_code = self._retailer_code(
+                    retailer_data, self._retailer_name(retailer_data),
+                )
+                partner_ext_ids.add(f'retailer_{retailer_code}')
+            order_details = order_data.get('order_details')
+            for item_data in order_details if isinstance(order_details, list) else []:
+                if not isinstance(item_data, dict):
+                    continue
+                try:
+                    variant_ids.add(int(item_data.get('internal_product_id')))
+                except (ValueError, TypeError):
+                    continue
+
+        orders = {}
+        if order_ids:
+            for order in self.env['sale.order'].search([
+                ('cartona_id', 'in', list(order_ids)),
+                ('cartona_config_id', '=', config.id),
+            ]):
+                orders.setdefault(order.cartona_id, order)
+        variants = {}
+        if variant_ids:
+            variants = {
+                variant.id: variant
+                for variant in self.env['product.product'].browse(list(variant_ids)).exists()
+            }
+        partners = {}
+        if partner_ext_ids:
+            for partner in self.env['res.partner'].with_context(skip_cartona_sync=True).search([
+                ('company_id', 'in', [config.company_id.id, False]),
+                ('cartona_config_id', '=', config.id),
+                ('cartona_id', 'in', list(partner_ext_ids)),
+            ]):
+                partners.setdefault(partner.cartona_id, partner)
+        return {'orders': orders, 'variants': variants, 'partners': partners}
+
+    def process_cartona_order(self, order_data, prefetch=None):
         issues = []
         try:
             config = self._get_cartona_config()
             validated_order, validation_issues = self._validate_order_data(
-                order_data, config=config,
+                order_data, config=config, prefetch=prefetch,
             )
             issues.extend(validation_issues)
             if not validated_order:
                 return self._make_result(False, order_data=order_data, issues=issues)
 
-            existing_order = self._find_existing_order(validated_order['order_id'], config)
+            existing_order = self._find_existing_order(
+                validated_order['order_id'], config, prefetch=prefetch,
+            )
             if existing_order:
                 if not self._ensure_order_lines(
                     existing_order,
                     validated_order['order_lines'],
                     order_data,
                     issues,
+                    prefetch=prefetch,
                 ):
                     self._mark_order_sync_error(
                         existing_order,
@@ -166,7 +242,9 @@ class CartonaOrderProcessor(models.Model):
                     is_new=False, updated=False, order=existing_order,
                 ))
 
-            new_order = self._create_new_order(validated_order, config, order_data, issues)
+            new_order = self._create_new_order(
+                validated_order, config, order_data, issues, prefetch=prefetch,
+            )
             if new_order:
                 issues.append(self._make_issue(
                     'success', 'order',
@@ -232,7 +310,7 @@ class CartonaOrderProcessor(models.Model):
             for line in order.order_line
         )
 
-    def _validate_order_data(self, order_data, config=None):
+    def _validate_order_data(self, order_data, config=None, prefetch=None):
         issues = []
         if isinstance(order_data, list):
             if not order_data:
@@ -281,17 +359,8 @@ class CartonaOrderProcessor(models.Model):
             return None, issues
 
         retailer_data = order_data.get('retailer', {})
-        retailer_name = (
-            retailer_data.get('retailer_name')
-            or retailer_data.get('name')
-            or 'Cartona Customer'
-        )
-        retailer_code = (
-            retailer_data.get('retailer_code')
-            or retailer_data.get('id')
-            or retailer_data.get('retailer_id')
-            or str(hash(retailer_name))[:8]
-        )
+        retailer_name = self._retailer_name(retailer_data)
+        retailer_code = self._retailer_code(retailer_data, retailer_name)
 
         delivered_by = order_data.get('delivered_by', 'delivered_by_supplier')
         if delivered_by not in ('delivered_by_supplier', 'delivered_by_cartona'):
@@ -332,7 +401,7 @@ class CartonaOrderProcessor(models.Model):
         validated_lines = []
         for line_data in order_details:
             validated_line, line_issue = self._validate_order_item(
-                line_data, order_data, config=config,
+                line_data, order_data, config=config, prefetch=prefetch,
             )
             if line_issue:
                 issues.append(line_issue)
@@ -351,7 +420,7 @@ class CartonaOrderProcessor(models.Model):
         normalized_data['order_lines'] = validated_lines
         return normalized_data, issues
 
-    def _validate_order_item(self, item_data, order_data, config=None):
+    def _validate_order_item(self, item_data, order_data, config=None, prefetch=None):
         order_ref = self._order_identifiers(order_data)
         order_label = order_ref.get('cartona_order_number') or order_ref.get('cartona_order_id') or '?'
         line_id = item_data.get('id') if isinstance(item_data, dict) else None
@@ -422,7 +491,7 @@ class CartonaOrderProcessor(models.Model):
             'comment': item_data.get('comment'),
         }
         product, error_code, error_message = self._resolve_variant(
-            normalized, config=config,
+            normalized, config=config, prefetch=prefetch,
         )
         if not product:
             return None, self._make_issue(
@@ -438,7 +507,9 @@ class CartonaOrderProcessor(models.Model):
             )
         return normalized, None
 
-    def _find_existing_order(self, order_id, config):
+    def _find_existing_order(self, order_id, config, prefetch=None):
+        if prefetch is not None:
+            return prefetch['orders'].get(order_id) or self.env['sale.order']
         return self.env['sale.order'].search([
             ('cartona_id', '=', order_id),
             ('cartona_config_id', '=', config.id),
@@ -450,10 +521,12 @@ class CartonaOrderProcessor(models.Model):
         state_mapping = config.get_state_mapping()
         return state_mapping.get(cartona_status, 'draft')
 
-    def _create_new_order(self, order_data, config, raw_order_data, issues):
+    def _create_new_order(self, order_data, config, raw_order_data, issues, prefetch=None):
         order_label = order_data.get('cartona_order_number') or order_data.get('order_id')
         try:
-            customer = self._find_or_create_customer(order_data['customer_data'], config)
+            customer = self._find_or_create_customer(
+                order_data['customer_data'], config, prefetch=prefetch,
+            )
             if not customer:
                 issues.append(self._make_issue(
                     'error', 'order',
@@ -485,7 +558,7 @@ class CartonaOrderProcessor(models.Model):
             order = self.env['sale.order'].with_context(skip_cartona_sync=True).create(order_vals)
 
             success = self._create_order_lines(
-                order, order_data['order_lines'], raw_order_data, issues,
+                order, order_data['order_lines'], raw_order_data, issues, prefetch=prefetch,
             )
             if not success:
                 order.unlink()
@@ -513,6 +586,10 @@ class CartonaOrderProcessor(models.Model):
                 ))
                 order.unlink()
                 return None
+            if prefetch is not None:
+                # A later duplicate of this hashed_id on the same page must
+                # find the order just created, not create a second one.
+                prefetch['orders'][order.cartona_id] = order
             return order
         except Exception as err:
             _logger.error('Error creating order: %s', err)
@@ -601,7 +678,7 @@ class CartonaOrderProcessor(models.Model):
         except Exception as err:
             _logger.error('Error completing delivery %s: %s', picking.name, err)
 
-    def _ensure_order_lines(self, order, items_data, order_data, issues):
+    def _ensure_order_lines(self, order, items_data, order_data, issues, prefetch=None):
         """Every payload line must match SO lines by cartona_line_id, variant, and qty."""
         order_label = order.cartona_order_number or order.cartona_id
         expected_sigs = self._payload_line_signatures(items_data)
@@ -620,7 +697,9 @@ class CartonaOrderProcessor(models.Model):
                     error_code='no_valid_order_lines',
                 ))
                 return False
-            return self._create_order_lines(order, items_data, order_data, issues)
+            return self._create_order_lines(
+                order, items_data, order_data, issues, prefetch=prefetch,
+            )
         issues.append(self._make_issue(
             'error', 'order',
             _('Order %(order)s rejected: SO lines do not match Cartona order details') % {
@@ -632,10 +711,6 @@ class CartonaOrderProcessor(models.Model):
         ))
         return False
 
-    def _rollback_created_order_lines(self, line_ids):
-        if line_ids:
-            self.env['sale.order.line'].browse(line_ids).unlink()
-
     def _update_existing_order(self, order, order_data, config, issues):
         order_label = order_data.get('cartona_order_number') or order_data.get('order_id')
         try:
@@ -683,74 +758,85 @@ class CartonaOrderProcessor(models.Model):
             ))
             return False
 
-    def _create_order_lines(self, order, items_data, order_data, issues):
-        lines_created = 0
-        created_line_ids = []
+    def _create_order_lines(self, order, items_data, order_data, issues, prefetch=None):
+        """Create every payload line of ``order`` in one ORM create, all-or-nothing.
+
+        All variants are resolved before anything is written, so a bad line
+        aborts without touching the order. The create itself runs under a
+        savepoint: if it fails, rolling the savepoint back removes whatever
+        part of the batch was inserted.
+        """
         order_label = order.cartona_order_number or order.cartona_id
-        try:
-            for item_data in items_data:
-                product, error_code, error_message = self._resolve_variant(
-                    item_data, config=order.cartona_config_id,
+        vals_list = []
+        for item_data in items_data:
+            product, error_code, error_message = self._resolve_variant(
+                item_data, config=order.cartona_config_id, prefetch=prefetch,
+            )
+            if not product:
+                line_id = item_data.get('cartona_line_id') or '?'
+                internal_product_id = item_data.get('internal_product_id')
+                issues.append(self._make_issue(
+                    'error', 'order_line',
+                    _('Order %(order)s failed on order detail #%(line)s: %(detail)s') % {
+                        'order': order_label,
+                        'line': line_id,
+                        'detail': error_message,
+                    },
+                    order_data={'hashed_id': order.cartona_id, 'receipt_id': order.cartona_order_number},
+                    item_data=item_data,
+                    error_code=error_code,
+                ))
+                _logger.error(
+                    'Order line creation failed for %s: internal_product_id=%s (%s)',
+                    order.name, internal_product_id, error_message,
                 )
-                if not product:
-                    line_id = item_data.get('cartona_line_id') or '?'
-                    internal_product_id = item_data.get('internal_product_id')
-                    issues.append(self._make_issue(
-                        'error', 'order_line',
-                        _('Order %(order)s failed on order detail #%(line)s: %(detail)s') % {
-                            'order': order_label,
-                            'line': line_id,
-                            'detail': error_message,
-                        },
-                        order_data={'hashed_id': order.cartona_id, 'receipt_id': order.cartona_order_number},
-                        item_data=item_data,
-                        error_code=error_code,
-                    ))
-                    _logger.error(
-                        'Order line creation failed for %s: internal_product_id=%s (%s)',
-                        order.name, internal_product_id, error_message,
-                    )
-                    self._rollback_created_order_lines(created_line_ids)
-                    return False
-
-                line = self.env['sale.order.line'].with_context(skip_cartona_sync=True).create({
-                    'order_id': order.id,
-                    'product_id': product.id,
-                    'name': product.name,
-                    'product_uom_qty': item_data['quantity'],
-                    'price_unit': item_data['unit_price'],
-                    'cartona_line_id': item_data.get('cartona_line_id'),
-                    'cartona_line_notes': item_data.get('comment'),
-                })
-                created_line_ids.append(line.id)
-                lines_created += 1
+                return False
+            vals_list.append({
+                'order_id': order.id,
+                'product_id': product.id,
+                'name': product.name,
+                'product_uom_qty': item_data['quantity'],
+                'price_unit': item_data['unit_price'],
+                'cartona_line_id': item_data.get('cartona_line_id'),
+                'cartona_line_notes': item_data.get('comment'),
+            })
+
+        try:
+            with self.env.cr.savepoint():
+                self.env['sale.order.line'].with_context(skip_cartona_sync=True).create(vals_list)
         except Exception as err:
-            self._rollback_created_order_lines(created_line_ids)
             issues.append(self._make_issue(
                 'error', 'order',
-                _('Order %(order)s failed while creating lines: %s') % (order_label, err),
+                _('Order %(order)s failed while creating lines: %(error)s') % {
+                    'order': order_label,
+                    'error': err,
+                },
                 order_data=order_data,
                 record=order,
                 error_code='unexpected_error',
             ))
             _logger.error('Error creating order lines for %s: %s', order.name, err)
             return False
-
-        if lines_created != len(items_data):
-            self._rollback_created_order_lines(created_line_ids)
-            return False
         return True
 
-    def _find_or_create_customer(self, customer_data, config):
+    def _find_or_create_customer(self, customer_data, config, prefetch=None):
         try:
-            return self.env['res.partner'].with_company(
+            external_id = customer_data.get('external_id')
+            partner = prefetch['partners'].get(external_id) if prefetch is not None else None
+            if partner:
+                partner._update_from_cartona_data(customer_data, config)
+                return partner
+            partner = self.env['res.partner'].with_company(
                 config.company_id,
             ).find_or_create_cartona_customer(customer_data, config)
+            if prefetch is not None and partner and external_id:
+                prefetch['partners'][external_id] = partner
+            return partner
         except Exception as err:
             _logger.error('Error finding/creating customer: %s', err)
             return None
 
-    def _resolve_variant(self, item_data, config=None):
+    def _resolve_variant(self, item_data, config=None, prefetch=None):
         if not config:
             config = self._get_cartona_config()
         internal_product_id = item_data.get('internal_product_id')
@@ -765,8 +851,11 @@ class CartonaOrderProcessor(models.Model):
                 'internal_product_id "%(value)s" is not a valid Odoo variant id'
             ) % {'value': internal_product_id}
 
-        variant = self.env['product.product'].browse(variant_id)
-        if not variant.exists():
+        if prefetch is not None:
+            variant = prefetch['variants'].get(variant_id) or self.env['product.product']
+        else:
+            variant = self.env['product.product'].browse(variant_id).exists()
+        if not variant:
             return None, 'variant_not_found', _(
                 'internal_product_id %(value)s does not match any Odoo variant'
             ) % {'value': internal_product_id}
@@ -1,5 +1,8 @@
 from odoo import models, fields, api, _
 
+# Upper bound of the back-off between two retries of a failed variant push.
+SYNC_RETRY_MAX_DELAY_SECONDS = 6 * 3600
+
 
 class CartonaProductSync(models.Model):
     _name = 'cartona.product.sync'
@@ -38,9 +41,20 @@ class CartonaProductSync(models.Model):
         ('syncing', 'Syncing'),
         ('synced', 'Synced'),
         ('error', 'Sync Error'),
+        ('deferred', 'Deferred (Cartona unavailable)'),
+        ('dead', 'Dead (retries exhausted)'),
     ], default='not_synced', required=True, index=True)
     sync_date = fields.Datetime(readonly=True)
     sync_error = fields.Text(readonly=True)
+    # Retry back-off, maintained by mark_error/mark_success; NULL
+    # next_attempt_at means due now (rows that never failed).
+    attempt_count = fields.Integer(string='Failed Attempts', readonly=True)
+    next_attempt_at = fields.Datetime(string='Next Retry', readonly=True)
+    # Values Cartona last accepted for this variant/config. Read back with raw
+    # SQL in split_unchanged_payloads, where NULL means "never pushed".
+    last_pushed_price = fields.Char(string='Last Pushed Price', readonly=True)
+    last_pushed_stock = fields.Integer(string='Last Pushed Stock', readonly=True)
+    last_pushed_unlimited = fields.Boolean(string='Last Pushed Unlimited Stock', readonly=True)
     display_name = fields.Char(compute='_compute_display_name')
 
     @api.depends('product_id', 'cartona_config_id')
@@ -129,11 +143,210 @@ class CartonaProductSync(models.Model):
             'sync_status': 'synced',
             'sync_date': fields.Datetime.now(),
             'sync_error': False,
+            'attempt_count': 0,
+            'next_attempt_at': False,
         })
 
     def mark_error(self, error=None):
+        """Record a failed push and schedule its retry.
+
+        The retry is due after the config's sync_retry_base_seconds doubled
+        for every earlier failure (capped at SYNC_RETRY_MAX_DELAY_SECONDS);
+        the row is parked as ``dead`` once it reaches sync_retry_max_attempts.
+        """
+        if not self:
+            return
+        self.flush_recordset(['sync_status', 'attempt_count', 'next_attempt_at'])
+        self.env.cr.execute("""
+            UPDATE cartona_product_sync s SET
+                attempt_count = COALESCE(s.attempt_count, 0) + 1,
+                sync_status = CASE
+                    WHEN COALESCE(s.attempt_count, 0) + 1 >= c.sync_retry_max_attempts
+                    THEN 'dead' ELSE 'error'
+                END,
+                next_attempt_at = (now() AT TIME ZONE 'UTC') + make_interval(secs => LEAST(
+                    %(max_delay)s,
+                    c.sync_retry_base_seconds * power(2, LEAST(COALESCE(s.attempt_count, 0), 30))
+                )),
+                sync_date = now() AT TIME ZONE 'UTC',
+                sync_error = %(error)s,
+                write_date = now() AT TIME ZONE 'UTC',
+                write_uid = %(uid)s
+            FROM cartona_config c
+            WHERE c.id = s.cartona_config_id AND s.id = ANY(%(ids)s)
+        """, {
+            'max_delay': SYNC_RETRY_MAX_DELAY_SECONDS,
+            'error': error or None,
+            'uid': self.env.uid,
+            'ids': self.ids,
+        })
+        self.invalidate_recordset([
+            'sync_status', 'attempt_count', 'next_attempt_at',
+            'sync_date', 'sync_error', 'write_date', 'write_uid',
+        ])
+
+    def mark_throttled(self, reason=None, retry_after=0):
+        """Hand the rows back after the rate limiter (or a 429) refused the
+        call: nothing reached Cartona, so no attempt is counted. They are
+        due again once ``retry_after`` seconds have passed. Dead rows (their
+        attempts exhausted; mark_syncing has already overwritten the status)
+        stay dead, out of the retry cron's reach."""
+        if not self:
+            return
+        self.flush_recordset(['sync_status', 'attempt_count', 'next_attempt_at'])
+        self.env.cr.execute("""
+            WITH rows AS (
+                SELECT s.id,
+                       s.sync_status = 'dead'
+                       OR COALESCE(s.attempt_count, 0) >= c.sync_retry_max_attempts AS dead
+                FROM cartona_product_sync s
+                JOIN cartona_config c ON c.id = s.cartona_config_id
+                WHERE s.id = ANY(%(ids)s)
+            )
+            UPDATE cartona_product_sync s SET
+                sync_status = CASE
+                    WHEN rows.dead THEN 'dead'
+                    WHEN COALESCE(s.attempt_count, 0) > 0 THEN 'error'
+                    ELSE 'not_synced'
+                END,
+                next_attempt_at = CASE
+                    WHEN rows.dead THEN s.next_attempt_at
+                    ELSE (now() AT TIME ZONE 'UTC') + make_interval(secs => %(wait)s)
+                END,
+                sync_error = CASE WHEN rows.dead THEN s.sync_error ELSE %(error)s END,
+                write_date = now() AT TIME ZONE 'UTC',
+                write_uid = %(uid)s
+            FROM rows
+            WHERE rows.id = s.id
+        """, {
+            'wait': float(retry_after or 0),
+            'error': reason or None,
+            'uid': self.env.uid,
+            'ids': self.ids,
+        })
+        self.invalidate_recordset([
+            'sync_status', 'next_attempt_at', 'sync_error', 'write_date', 'write_uid',
+        ])
+
+    def action_retry_now(self):
+        """Make the rows due for the next retry run, dead ones included."""
         self.sudo().write({
-            'sync_status': 'error',
-            'sync_date': fields.Datetime.now(),
-            'sync_error': error or False,
+            'sync_status': 'not_synced',
+            'attempt_count': 0,
+            'next_attempt_at': False,
         })
+
+    def mark_deferred(self, reason=None):
+        """Parked while the config's circuit breaker is open; the variants are
+        back in cartona.sync.outbox and go out with its next flush."""
+        self.sudo().write({
+            'sync_status': 'deferred',
+            'sync_error': reason or False,
+        })
+
+    @api.model
+    def _payload_matches_pushed(self, payload, pushed):
+        if not pushed:
+            return False
+        price, stock, unlimited = pushed
+        if 'selling_price' in payload and payload['selling_price'] != price:
+            return False
+        if 'is_unlimited_stock' in payload:
+            if unlimited is None or payload['is_unlimited_stock'] != unlimited:
+                return False
+            if not unlimited and payload.get('available_stock_quantity') != stock:
+                return False
+        return True
+
+    @api.model
+    def _stock_change_insignificant(self, config, payload, pushed):
+        if not pushed or 'available_stock_quantity' not in payload:
+            return False
+        price, stock, unlimited = pushed
+        if unlimited is not False or stock is None:
+            return False
+        if 'selling_price' in payload and payload['selling_price'] != price:
+            return False
+        return not config._is_significant_stock_change(
+            stock, payload['available_stock_quantity'],
+        )
+
+    @api.model
+    def pushed_values(self, config, product_ids):
+        """{product_id: (price, stock, unlimited)} last pushed to ``config``.
+
+        Variants without a sync row are absent; NULL values mean never pushed.
+        """
+        if not product_ids:
+            return {}
+        self.flush_model(['last_pushed_price', 'last_pushed_stock', 'last_pushed_unlimited'])
+        self.env.cr.execute("""
+            SELECT product_id, last_pushed_price, last_pushed_stock, last_pushed_unlimited
+            FROM cartona_product_sync
+            WHERE cartona_config_id = %s AND product_id = ANY(%s)
+        """, (config.id, list(product_ids)))
+        return {row[0]: row[1:] for row in self.env.cr.fetchall()}
+
+    @api.model
+    def split_unchanged_payloads(self, config, payloads):
+        """Split bulk-update payloads into (changed payloads, unchanged variant ids).
+
+        A payload is unchanged when every value it carries equals what was
+        last successfully pushed for that variant to ``config``, or when only
+        its stock moved and the move is below the config's significance rules
+        (see cartona.config._is_significant_stock_change). The last pushed
+        stock is left as is then, so small moves add up until one is pushed.
+        """
+        if not payloads:
+            return [], []
+        pushed = self.pushed_values(
+            config, [int(payload['internal_product_id']) for payload in payloads],
+        )
+        changed, unchanged_ids = [], []
+        for payload in payloads:
+            product_id = int(payload['internal_product_id'])
+            if (self._payload_matches_pushed(payload, pushed.get(product_id))
+                    or self._stock_change_insignificant(config, payload, pushed.get(product_id))):
+                unchanged_ids.append(product_id)
+            else:
+                changed.append(payload)
+        return changed, unchanged_ids
+
+    @api.model
+    def remember_pushed_payloads(self, config, payloads):
+        """Store the values of payloads Cartona accepted, one UPDATE per batch.
+
+        Price-only / stock-only payloads leave the other columns untouched.
+        """
+        if not payloads:
+            return
+        product_ids, prices, stocks, unlimited = [], [], [], []
+        for payload in payloads:
+            product_ids.append(int(payload['internal_product_id']))
+            prices.append(payload.get('selling_price'))
+            stocks.append(payload.get('available_stock_quantity'))
+            unlimited.append(payload.get('is_unlimited_stock'))
+        self.env.cr.execute("""
+            UPDATE cartona_product_sync s SET
+                last_pushed_price = COALESCE(v.price, s.last_pushed_price),
+                last_pushed_unlimited = COALESCE(v.unlimited, s.last_pushed_unlimited),
+                last_pushed_stock = CASE
+                    WHEN v.unlimited IS NULL THEN s.last_pushed_stock ELSE v.stock
+                END
+            FROM unnest(%s::int[], %s::varchar[], %s::int[], %s::bool[])
+                AS v(product_id, price, stock, unlimited)
+            WHERE s.cartona_config_id = %s AND s.product_id = v.product_id
+        """, (product_ids, prices, stocks, unlimited, config.id))
+        self.invalidate_model(['last_pushed_price', 'last_pushed_stock', 'last_pushed_unlimited'])
+
+    @api.model
+    def forget_pushed_values(self, configs):
+        """Force the next push of every variant of ``configs`` (e.g. new warehouse or token)."""
+        if not configs:
+            return
+        self.env.cr.execute("""
+            UPDATE cartona_product_sync
+            SET last_pushed_price = NULL, last_pushed_stock = NULL, last_pushed_unlimited = NULL
+            WHERE cartona_config_id = ANY(%s)
+        """, (configs.ids,))
+        self.invalidate_model(['last_pushed_price', 'last_pushed_stock', 'last_pushed_unlimited'])
@@ -0,0 +1,130 @@
+from odoo import models, fields, api
+
+
+class CartonaRateLimit(models.Model):
+    """Token bucket shared by every worker calling Cartona for one config.
+
+    Created with its config, then only ever touched through raw SQL on a
+    dedicated cursor that commits immediately, so the bucket row is never
+    locked for longer than one UPDATE and every worker sees the others'
+    consumption right away. With the limit off it is only read.
+    """
+    _name = 'cartona.rate.limit'
+    _description = 'Cartona API Rate Limit State (per config)'
+
+    _sql_constraints = [
+        (
+            'config_uniq',
+            'unique(cartona_config_id)',
+            'Only one rate limit state per Cartona configuration.',
+        ),
+    ]
+
+    cartona_config_id = fields.Many2one(
+        'cartona.config',
+        required=True,
+        ondelete='cascade',
+    )
+    tokens = fields.Float(readonly=True)
+    refilled_at = fields.Datetime(readonly=True)
+    blocked_until = fields.Datetime(
+        readonly=True,
+        help='Set from a Cartona 429 Retry-After: no call is made before this time.',
+    )
+
+    @api.model
+    def _create_for_configs(self, configs):
+        """Create the bucket rows of new configs, full."""
+        self.sudo().create([{
+            'cartona_config_id': config.id,
+            'tokens': max(config.rate_limit_burst, 1),
+            'refilled_at': fields.Datetime.now(),
+        } for config in configs])
+
+    @api.model
+    def acquire(self, config, cr=None):
+        """Take one request token for ``config``.
+
+        Returns 0 when the caller may call Cartona now, otherwise the number
+        of seconds until it may (a Retry-After block or an empty bucket).
+        With rate_limit_per_minute at 0 only Retry-After blocks apply, read
+        without any lock or write. ``cr`` is the caller's dedicated guard
+        cursor (see cartona.api._make_request); one is opened otherwise.
+        """
+        if cr is None:
+            with self.env.registry.cursor() as cr:
+                return self.acquire(config, cr=cr)
+        rate = config.rate_limit_per_minute / 60.0
+        if not rate:
+            cr.execute("""
+                SELECT GREATEST(EXTRACT(
+                    EPOCH FROM blocked_until - (clock_timestamp() AT TIME ZONE 'UTC')
+                ), 0)
+                FROM cartona_rate_limit
+                WHERE cartona_config_id = %s
+            """, (config.id,))
+            row = cr.fetchone()
+            return float(row[0]) if row and row[0] else 0
+        burst = max(config.rate_limit_burst, 1)
+        params = {'config_id': config.id, 'burst': burst, 'rate': rate, 'uid': self.env.uid}
+        row = None
+        while row is None:
+            cr.execute("""
+                WITH state AS (
+                    SELECT id,
+                           LEAST(%(burst)s::float, tokens + %(rate)s * EXTRACT(
+                               EPOCH FROM (clock_timestamp() AT TIME ZONE 'UTC') - refilled_at
+                           )) AS available,
+                           GREATEST(EXTRACT(
+                               EPOCH FROM blocked_until - (clock_timestamp() AT TIME ZONE 'UTC')
+                           ), 0) AS blocked_for
+                    FROM cartona_rate_limit
+                    WHERE cartona_config_id = %(config_id)s
+                    FOR UPDATE
+                )
+                UPDATE cartona_rate_limit r SET
+                    tokens = CASE
+                        WHEN state.blocked_for = 0 AND state.available >= 1
+                        THEN state.available - 1 ELSE state.available
+                    END,
+                    refilled_at = clock_timestamp() AT TIME ZONE 'UTC'
+                FROM state
+                WHERE r.id = state.id
+                RETURNING state.available, state.blocked_for
+            """, params)
+            row = cr.fetchone()
+            if row is None:
+                # Rows are created with the config; only a lost one lands here.
+                cr.execute("""
+                    INSERT INTO cartona_rate_limit
+                        (cartona_config_id, tokens, refilled_at, create_date, write_date, create_uid, write_uid)
+                    VALUES (%(config_id)s, %(burst)s, now() AT TIME ZONE 'UTC', now(), now(), %(uid)s, %(uid)s)
+                    ON CONFLICT (cartona_config_id) DO NOTHING
+                """, params)
+        # Release the row at once: the caller may sleep before its next try.
+        cr.commit()
+        available, blocked_for = row
+        if blocked_for:
+            return float(blocked_for)
+        if available >= 1:
+            return 0
+        return (1 - available) / rate
+
+    @api.model
+    def block(self, config, seconds):
+        """Stop every worker from calling ``config`` for ``seconds`` (Retry-After)."""
+        with self.env.registry.cursor() as cr:
+            cr.execute("""
+                INSERT INTO cartona_rate_limit
+                    (cartona_config_id, tokens, refilled_at, blocked_until,
+                     create_date, write_date, create_uid, write_uid)
+                VALUES (%(config_id)s, 0, now() AT TIME ZONE 'UTC',
+                        (now() AT TIME ZONE 'UTC') + make_interval(secs => %(seconds)s),
+                        now(), now(), %(uid)s, %(uid)s)
+                ON CONFLICT (cartona_config_id) DO UPDATE SET
+                    tokens = 0,
+                    refilled_at = EXCLUDED.refilled_at,
+                    blocked_until = GREATEST(
+                        cartona_rate_limit.blocked_until, EXCLUDED.blocked_until
+                    )
+            """, {'config_id': config.id, 'seconds': seconds, 'uid': self.env.uid})
@@ -1,10 +1,22 @@
 from odoo import models, fields, api, _
 from odoo.exceptions import AccessError
+from odoo.tools import SQL
 from datetime import timedelta
 import logging
+import random
+import time
+
+from . import cartona_log_partition
 
 _logger = logging.getLogger(__name__)
 
+# Statuses always logged in detail, whatever the config's log level.
+PROBLEM_STATUSES = ('error', 'warning')
+# Rows deleted per statement (and per commit) by the log retention purge.
+LOG_PURGE_CHUNK_SIZE = 5000
+# Seconds one cleanup_old_logs run may spend purging before it stops.
+LOG_PURGE_TIME_BUDGET = 600
+
 
 class CartonaSyncLog(models.Model):
     _name = 'cartona.sync.log'
@@ -12,6 +24,10 @@ class CartonaSyncLog(models.Model):
     _order = 'create_date desc'
     _rec_name = 'operation_type'
 
+    # Partition key, part of the primary key (see cartona_log_partition):
+    # required so the schema update never drops its NOT NULL.
+    create_date = fields.Datetime(string='Created on', required=True, readonly=True)
+
     cartona_config_id = fields.Many2one(
         'cartona.config',
         required=True,
@@ -37,8 +53,12 @@ class CartonaSyncLog(models.Model):
     record_name = fields.Char()
     message = fields.Text(required=True)
     error_details = fields.Text()
-    request_data = fields.Text()
-    response_data = fields.Text()
+    # Payload texts live once, compressed, in cartona.sync.payload; they
+    # are only decompressed when these computed fields are read (form view).
+    request_payload_id = fields.Many2one('cartona.sync.payload', index=True, readonly=True)
+    response_payload_id = fields.Many2one('cartona.sync.payload', index=True, readonly=True)
+    request_data = fields.Text(compute='_compute_payload_data')
+    response_data = fields.Text(compute='_compute_payload_data')
     duration = fields.Float(string='Duration (seconds)')
     records_processed = fields.Integer(default=0)
     records_success = fields.Integer(default=0)
@@ -55,6 +75,7 @@ class CartonaSyncLog(models.Model):
     def create(self, vals_list):
         if not self.env.su and not self.env.context.get('cartona_sync_log_internal'):
             raise AccessError(_('Sync logs cannot be created manually.'))
+        self.env['cartona.sync.payload'].sudo().convert_vals_list(vals_list)
         return super().create(vals_list)
 
     def write(self, vals):
@@ -65,8 +86,22 @@ class CartonaSyncLog(models.Model):
     def unlink(self):
         if not self.env.su and not self.env.context.get('cartona_sync_log_internal'):
             raise AccessError(_('Sync logs cannot be deleted manually.'))
+        # No ondelete cascade in the database: the tables are partitioned
+        # (see cartona_log_partition), so the lines go first, explicitly.
+        self.env['cartona.sync.log.line'].sudo().with_context(
+            cartona_sync_log_internal=True,
+        ).search([('sync_log_id', 'in', self.ids)]).unlink()
         return super().unlink()
 
+    @api.depends('request_payload_id', 'response_payload_id')
+    def _compute_payload_data(self):
+        texts = self.env['cartona.sync.payload'].sudo().load_texts(
+            self.request_payload_id.ids + self.response_payload_id.ids,
+        )
+        for record in self:
+            record.request_data = texts.get(record.request_payload_id.id, False)
+            record.response_data = texts.get(record.response_payload_id.id, False)
+
     def copy(self, default=None):
         raise AccessError(_('Sync logs cannot be duplicated.'))
 
@@ -77,6 +112,15 @@ class CartonaSyncLog(models.Model):
 
     @api.model
     def log_operation(self, cartona_config_id, operation_type, status, message, line_vals_list=None, **kwargs):
+        """Write a log and its detail lines, trimmed to the config's log
+        level (see _apply_log_level). Returns the log, or an empty
+        recordset when nothing was worth writing."""
+        kwargs.setdefault('action_type', 'automated')
+        line_vals_list = self._apply_log_level(
+            cartona_config_id, status, line_vals_list or [], kwargs,
+        )
+        if line_vals_list is None:
+            return self.browse()
         vals = {
             'cartona_config_id': cartona_config_id,
             'operation_type': operation_type,
@@ -85,16 +129,40 @@ class CartonaSyncLog(models.Model):
             'user_id': self.env.uid,
             **kwargs,
         }
-        if 'action_type' not in vals:
-            vals['action_type'] = 'automated'
         log = self.sudo().create(vals)
         if line_vals_list:
-            self.env['cartona.sync.log.line'].sudo().create([
-                {**line_vals, 'sync_log_id': log.id}
-                for line_vals in line_vals_list
-            ])
+            self.env['cartona.sync.log.line'].sudo()._bulk_insert(
+                log, [dict(line_vals) for line_vals in line_vals_list],
+            )
         return log
 
+    @api.model
+    def _apply_log_level(self, cartona_config_id, status, line_vals_list, kwargs):
+        """Return the detail lines to write for an operation, or None to
+        skip it. Below the Full level, success and info details (lines and
+        payloads, dropped from ``kwargs`` in place) are not kept; at Errors
+        Only, operations without an error or warning are not logged at all.
+        Manual actions and the sampled share of automated ones keep
+        everything."""
+        config = self.env['cartona.config'].sudo().browse(cartona_config_id)
+        level = config.log_level or 'full'
+        if level == 'full' or kwargs['action_type'] == 'manual':
+            return line_vals_list
+        if (config.log_success_sample_pct
+                and random.random() * 100 < config.log_success_sample_pct):
+            return line_vals_list
+        problem_lines = [
+            line_vals for line_vals in line_vals_list
+            if line_vals.get('status') in PROBLEM_STATUSES
+        ]
+        if status in PROBLEM_STATUSES:
+            return problem_lines
+        if level == 'errors' and not problem_lines:
+            return None
+        kwargs.pop('request_data', None)
+        kwargs.pop('response_data', None)
+        return problem_lines
+
     @api.model
     def log_product_sync(self, cartona_config_id, variant, status, message, **kwargs):
         operation_type = kwargs.pop('operation_type', 'product_sync')
@@ -110,14 +178,160 @@ class CartonaSyncLog(models.Model):
         )
 
     @api.model
-    def cleanup_old_logs(self, days=30):
+    def ensure_log_partitions(self):
+        """Cron: create the monthly log partitions ahead of time."""
+        return cartona_log_partition.ensure_partitions(self.env.cr)
+
+    @api.model
+    def delete_for_configs(self, config_ids):
+        """Delete the logs and lines of ``config_ids`` in two statements, in
+        place of the foreign key cascade partitioned tables do not have."""
+        if not config_ids:
+            return
+        self.env['cartona.sync.log.line'].flush_model()
+        self.flush_model()
+        self.env.cr.execute("""
+            DELETE FROM cartona_sync_log_line
+            WHERE sync_log_id IN (
+                SELECT id FROM cartona_sync_log WHERE cartona_config_id = ANY(%s)
+            )
+        """, (list(config_ids),))
+        self.env.cr.execute(
+            "DELETE FROM cartona_sync_log WHERE cartona_config_id = ANY(%s)",
+            (list(config_ids),),
+        )
+        self.env['cartona.sync.log.line'].invalidate_model()
+        self.invalidate_model()
+
+    @api.model
+    def cleanup_old_logs(self, days=30, chunk_size=LOG_PURGE_CHUNK_SIZE,
+                         time_budget=LOG_PURGE_TIME_BUDGET):
+        """Cron: delete the logs and lines older than ``days`` days.
+
+        Whole expired months are dropped as partitions. What is left of the
+        oldest remaining month is purged per config by _purge_config_logs,
+        in committed chunks and within ``time_budget`` seconds; leftovers go
+        with the next run. Each config gets a log entry with its figures.
+        """
+        start = time.monotonic()
+        deadline = start + time_budget
         cutoff = fields.Datetime.now() - timedelta(days=days)
-        old_logs = self.search([('create_date', '<', cutoff)])
-        count = len(old_logs)
-        if old_logs:
-            old_logs.with_context(cartona_sync_log_internal=True).sudo().unlink()
-            _logger.info('Cleaned up %s old Cartona sync logs', count)
-        return count
+        self.env.flush_all()
+        dropped = cartona_log_partition.drop_expired_partitions(self.env.cr, cutoff)
+        self.env.cr.commit()
+        self.env.invalidate_all()
+
+        total_logs = 0
+        finished = True
+        configs = self.env['cartona.config'].sudo().with_context(active_test=False).search([])
+        for config in configs:
+            config_start = time.monotonic()
+            log_count, line_count, done = self._purge_config_logs(
+                config.id, cutoff, chunk_size, deadline,
+            )
+            total_logs += log_count
+            finished = finished and done
+            self.env.invalidate_all()
+            if log_count or line_count or not done:
+                # Created directly: the report is kept whatever the config's
+                # log level, which log_operation would apply.
+                self.sudo().create({
+                    'cartona_config_id': config.id,
+                    'operation_type': 'bulk_operation',
+                    'status': 'info' if done else 'warning',
+                    'message': _(
+                        'Log retention (%(days)s days): deleted %(logs)s logs and '
+                        '%(lines)s detail lines in %(seconds).1fs%(rest)s'
+                    ) % {
+                        'days': days,
+                        'logs': log_count,
+                        'lines': line_count,
+                        'seconds': time.monotonic() - config_start,
+                        'rest': '' if done else _(', time budget reached, the rest '
+                                                  'is deleted by the next run'),
+                    },
+                    'records_processed': log_count + line_count,
+                    'records_success': log_count + line_count,
+                    'duration': time.monotonic() - config_start,
+                    'action_type': 'automated',
+                })
+                self.env.cr.commit()
+            if not done:
+                break
+
+        payload_count = 0
+        if (dropped or total_logs) and time.monotonic() < deadline:
+            payload_count = self.env['cartona.sync.payload'].sudo().gc_orphans()
+            self.env.cr.commit()
+        _logger.info(
+            'Cartona log retention: %s expired partitions dropped, %s logs purged, '
+            '%s unreferenced payloads removed in %.1fs%s',
+            len(dropped), total_logs, payload_count, time.monotonic() - start,
+            '' if finished else ' (time budget reached)',
+        )
+        return total_logs
+
+    @api.model
+    def _purge_config_logs(self, config_id, cutoff, chunk_size, deadline):
+        """Delete the config's logs created before ``cutoff`` with plain SQL:
+        lines first, then their logs, ``chunk_size`` rows per statement and
+        a commit after each, so no lock is held for long. Logs are walked
+        in id order; the selection uses the (config, create_date, status)
+        index and the line deletes the sync_log_id-led one.
+
+        Returns (logs deleted, lines deleted, finished before ``deadline``).
+        """
+        cr = self.env.cr
+        log_count = line_count = 0
+        last_id = 0
+        while True:
+            if time.monotonic() >= deadline:
+                return log_count, line_count, False
+            cr.execute("""
+                SELECT id FROM cartona_sync_log
+                WHERE cartona_config_id = %s AND create_date < %s AND id > %s
+                ORDER BY id
+                LIMIT %s
+            """, (config_id, cutoff, last_id, chunk_size))
+            log_ids = [row[0] for row in cr.fetchall()]
+            if not log_ids:
+                return log_count, line_count, True
+            while True:
+                cr.execute("""
+                    DELETE FROM cartona_sync_log_line
+                    WHERE id IN (
+                        SELECT id FROM cartona_sync_log_line
+                        WHERE sync_log_id = ANY(%s)
+                        LIMIT %s
+                    )
+                    RETURNING id
+                """, (log_ids, chunk_size))
+                line_ids = [row[0] for row in cr.fetchall()]
+                self._purge_log_references('cartona_sync_log_line', line_ids)
+                line_count += len(line_ids)
+                cr.commit()
+                if len(line_ids) < chunk_size:
+                    break
+                if time.monotonic() >= deadline:
+                    return log_count, line_count, False
+            self._purge_log_references('cartona_sync_log', log_ids)
+            cr.execute("DELETE FROM cartona_sync_log WHERE id = ANY(%s)", (log_ids,))
+            log_count += cr.rowcount
+            cr.commit()
+            last_id = log_ids[-1]
+
+    @api.model
+    def _purge_log_references(self, table, ids):
+        """Remove the many2many rows pointing at the deleted ``ids`` of
+        ``table``; they have no foreign key cascade to do it."""
+        if not ids:
+            return
+        for rel_table, column, target in cartona_log_partition.LOG_REFERENCES:
+            if target == table:
+                self.env.cr.execute(
+                    SQL("DELETE FROM %s WHERE %s = ANY(%s)",
+                        SQL.identifier(rel_table), SQL.identifier(column), ids),
+                )
 
     def action_view_record(self):
         self.ensure_one()
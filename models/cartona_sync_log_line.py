@@ -1,12 +1,33 @@
 from odoo import models, fields, api, _
 from odoo.exceptions import AccessError
 
+# Stored columns written by _bulk_insert, with their SQL array type.
+BULK_INSERT_COLUMNS = {
+    'status': 'varchar',
+    'entry_type': 'varchar',
+    'error_code': 'varchar',
+    'cartona_order_id': 'varchar',
+    'cartona_order_number': 'varchar',
+    'cartona_line_id': 'varchar',
+    'internal_product_id': 'varchar',
+    'record_model': 'varchar',
+    'record_id': 'int4',
+    'record_name': 'varchar',
+    'message': 'text',
+    'request_payload_id': 'int4',
+    'response_payload_id': 'int4',
+}
+
 
 class CartonaSyncLogLine(models.Model):
     _name = 'cartona.sync.log.line'
     _description = 'Cartona Sync Log Detail'
     _order = 'id'
 
+    # Partition key, part of the primary key (see cartona_log_partition):
+    # required so the schema update never drops its NOT NULL.
+    create_date = fields.Datetime(string='Created on', required=True, readonly=True)
+
     sync_log_id = fields.Many2one(
         'cartona.sync.log',
         required=True,
@@ -55,8 +76,12 @@ class CartonaSyncLogLine(models.Model):
     record_id = fields.Integer(readonly=True)
     record_name = fields.Char(readonly=True)
     message = fields.Text(required=True, readonly=True)
-    request_data = fields.Text(readonly=True)
-    response_data = fields.Text(readonly=True)
+    # Payload texts live once, compressed, in cartona.sync.payload; they
+    # are only decompressed when these computed fields are read (form view).
+    request_payload_id = fields.Many2one('cartona.sync.payload', index=True, readonly=True)
+    response_payload_id = fields.Many2one('cartona.sync.payload', index=True, readonly=True)
+    request_data = fields.Text(compute='_compute_payload_data')
+    response_data = fields.Text(compute='_compute_payload_data')
     sync_log_create_date = fields.Datetime(
         related='sync_log_id.create_date',
         string='Log Date',
@@ -72,8 +97,42 @@ class CartonaSyncLogLine(models.Model):
     def create(self, vals_list):
         if not self.env.su and not self.env.context.get('cartona_sync_log_internal'):
             raise AccessError(_('Sync log details cannot be created manually.'))
+        self.env['cartona.sync.payload'].sudo().convert_vals_list(vals_list)
         return super().create(vals_list)
 
+    @api.model
+    def _bulk_insert(self, log, vals_list):
+        """Insert the detail lines ``vals_list`` of ``log`` with a single
+        INSERT ... SELECT unnest(...), bypassing the ORM create (its override
+        only gates access). Values are taken as given: only the columns of
+        BULK_INSERT_COLUMNS, the field defaults and the payload conversion
+        are applied. Lines share the log's create_date, so they land in the
+        same partition. Returns the created lines."""
+        if not vals_list:
+            return self.browse()
+        self.env['cartona.sync.payload'].sudo().convert_vals_list(vals_list)
+        defaults = self.default_get(list(BULK_INSERT_COLUMNS))
+        columns = list(BULK_INSERT_COLUMNS)
+        rows = [
+            [vals.get(column, defaults.get(column)) or None for column in columns]
+            for vals in vals_list
+        ]
+        self.env.cr.execute(f"""
+            INSERT INTO cartona_sync_log_line (
+                sync_log_id, create_uid, create_date, write_uid, write_date,
+                {', '.join(f'"{column}"' for column in columns)}
+            )
+            SELECT %s, %s, %s, %s, %s, *
+            FROM unnest({', '.join(f'%s::{BULK_INSERT_COLUMNS[column]}[]' for column in columns)})
+            RETURNING id
+        """, [
+            log.id, self.env.uid, log.create_date, self.env.uid, log.create_date,
+            *([row[index] for row in rows] for index in range(len(columns))),
+        ])
+        line_ids = [row[0] for row in self.env.cr.fetchall()]
+        log.invalidate_recordset(['line_ids', 'detail_count'])
+        return self.browse(line_ids)
+
     def write(self, vals):
         if not self.env.su and not self.env.context.get('cartona_sync_log_internal'):
             raise AccessError(_('Sync log details are read-only.'))
@@ -84,5 +143,14 @@ class CartonaSyncLogLine(models.Model):
             raise AccessError(_('Sync log details cannot be deleted manually.'))
         return super().unlink()
 
+    @api.depends('request_payload_id', 'response_payload_id')
+    def _compute_payload_data(self):
+        texts = self.env['cartona.sync.payload'].sudo().load_texts(
+            self.request_payload_id.ids + self.response_payload_id.ids,
+        )
+        for record in self:
+            record.request_data = texts.get(record.request_payload_id.id, False)
+            record.response_data = texts.get(record.response_payload_id.id, False)
+
     def copy(self, default=None):
         raise AccessError(_('Sync log details cannot be duplicated.'))
@@ -0,0 +1,85 @@
+from odoo import models, fields, api
+
+# Upper bound of bulk-update batches a single flush hands to the queue per
+# config. Anything above that stays in the outbox for the next cron tick, so
+# one huge inventory adjustment can't monopolise the cartona channel.
+OUTBOX_FLUSH_MAX_BATCHES = 50
+
+
+class CartonaSyncOutbox(models.Model):
+    _name = 'cartona.sync.outbox'
+    _description = 'Cartona Pending Stock Push (per variant and config)'
+    _order = 'id'
+
+    _sql_constraints = [
+        (
+            'product_config_uniq',
+            'unique(product_id, cartona_config_id)',
+            'Only one pending push per variant and Cartona configuration.',
+        ),
+    ]
+
+    product_id = fields.Many2one(
+        'product.product',
+        required=True,
+        ondelete='cascade',
+        index=True,
+    )
+    cartona_config_id = fields.Many2one(
+        'cartona.config',
+        required=True,
+        ondelete='cascade',
+        index=True,
+    )
+    company_id = fields.Many2one(
+        'res.company',
+        related='cartona_config_id.company_id',
+        store=True,
+        index=True,
+    )
+
+    @api.model
+    def mark_dirty(self, products, config):
+        """Record that ``products`` need a push to ``config``.
+
+        Triggers (quant writes, done moves) only land here instead of
+        enqueuing one job per variant: repeated changes to the same variant
+        before the next flush collapse onto the existing row. Raw upsert for
+        the same reason as cartona.product.sync.ensure_for_products - this
+        runs inside stock hot paths and must never raise UniqueViolation.
+        """
+        if not products or not config:
+            return
+        self.env.cr.execute("""
+            INSERT INTO cartona_sync_outbox
+                (product_id, cartona_config_id, company_id, create_date, write_date, create_uid, write_uid)
+            SELECT p, %(config_id)s, %(company_id)s, now(), now(), %(uid)s, %(uid)s
+            FROM unnest(%(product_ids)s) AS p
+            ON CONFLICT (product_id, cartona_config_id) DO NOTHING
+        """, {
+            'config_id': config.id,
+            'company_id': config.company_id.id,
+            'uid': self.env.uid,
+            'product_ids': list(set(products.ids)),
+        })
+
+    @api.model
+    def drain(self, config, limit):
+        """Pop up to ``limit`` pending variant ids for ``config``, oldest first.
+
+        Rows are deleted in the caller's transaction, so the batch jobs it
+        enqueues and the removal commit (or roll back) together. SKIP LOCKED
+        keeps two overlapping flushes from handing out the same variant.
+        """
+        self.env.cr.execute("""
+            DELETE FROM cartona_sync_outbox
+            WHERE id IN (
+                SELECT id FROM cartona_sync_outbox
+                WHERE cartona_config_id = %s
+                ORDER BY id
+                LIMIT %s
+                FOR UPDATE SKIP LOCKED
+            )
+            RETURNING id, product_id
+        """, (config.id, limit))
+        return [product_id for _id, product_id in sorted(self.env.cr.fetchall())]
@@ -0,0 +1,153 @@
+import hashlib
+import zlib
+
+import psycopg2
+
+from odoo import models, fields, api
+from odoo.tools import SQL
+
+# Advisory lock class (see ORDER_PULL_LOCK_CLASS in cartona_api): held
+# shared by transactions reusing stored payloads, exclusive while
+# gc_orphans deletes unreferenced ones.
+PAYLOAD_GC_LOCK_CLASS = 7421
+
+PAYLOAD_FIELDS = {
+    'request_data': 'request_payload_id',
+    'response_data': 'response_payload_id',
+}
+
+
+class CartonaSyncPayload(models.Model):
+    """Request/response text of sync logs, stored once and zlib-compressed.
+
+    cartona.sync.log and cartona.sync.log.line only keep a reference to the
+    row of their payload; a bulk-update response shared by the up-to-1000
+    detail lines of a batch is stored a single time. Rows are keyed by the
+    SHA-256 of the text. The digest is indexed but deliberately not unique:
+    two transactions logging the same payload concurrently may each store
+    it, which is harmless, whereas a unique upsert would make one of them
+    fail with a serialization error under REPEATABLE READ.
+
+    ``data`` holds the raw compressed bytes and is only read and written
+    with SQL (store_texts / load_texts), never through the ORM. Rows no
+    longer referenced are removed by gc_orphans, run after log cleanup;
+    an advisory lock keeps it from deleting a row being reused.
+    """
+    _name = 'cartona.sync.payload'
+    _description = 'Cartona Sync Log Payload'
+    _log_access = False
+
+    digest = fields.Char(required=True, index=True, readonly=True)
+    data = fields.Binary(attachment=False, readonly=True)
+    size = fields.Integer(string='Uncompressed Size', readonly=True)
+
+    @api.model
+    def _digest(self, text):
+        return hashlib.sha256(text.encode()).hexdigest()
+
+    @api.model
+    def store_texts(self, texts):
+        """Return {text: payload id} for the non-empty ``texts``, storing
+        the ones not seen before."""
+        by_digest = {self._digest(text): text for text in set(texts) if text}
+        if not by_digest:
+            return {}
+        ids_by_digest = {}
+        # Stored rows are only reused under the shared lock, so gc_orphans
+        # cannot delete one before the log referencing it is committed.
+        # While it runs, the texts are simply stored again.
+        self.env.cr.execute(
+            "SELECT pg_try_advisory_xact_lock_shared(%s, 0)", (PAYLOAD_GC_LOCK_CLASS,),
+        )
+        if self.env.cr.fetchone()[0]:
+            self.env.cr.execute("""
+                SELECT digest, MIN(id) FROM cartona_sync_payload
+                WHERE digest = ANY(%s)
+                GROUP BY digest
+            """, (list(by_digest),))
+            ids_by_digest.update(self.env.cr.fetchall())
+        missing = [digest for digest in by_digest if digest not in ids_by_digest]
+        if missing:
+            encoded = [by_digest[digest].encode() for digest in missing]
+            self.env.cr.execute("""
+                INSERT INTO cartona_sync_payload (digest, data, size)
+                SELECT * FROM unnest(%s::varchar[], %s::bytea[], %s::int[])
+                RETURNING digest, id
+            """, (
+                missing,
+                [psycopg2.Binary(zlib.compress(raw)) for raw in encoded],
+                [len(raw) for raw in encoded],
+            ))
+            ids_by_digest.update(self.env.cr.fetchall())
+        return {text: ids_by_digest[digest] for digest, text in by_digest.items()}
+
+    @api.model
+    def load_texts(self, payload_ids):
+        """Return {payload id: text}, decompressing only these rows."""
+        payload_ids = [payload_id for payload_id in set(payload_ids) if payload_id]
+        if not payload_ids:
+            return {}
+        self.env.cr.execute(
+            "SELECT id, data FROM cartona_sync_payload WHERE id = ANY(%s)",
+            (payload_ids,),
+        )
+        return {
+            payload_id: zlib.decompress(bytes(data)).decode()
+            for payload_id, data in self.env.cr.fetchall()
+            if data is not None
+        }
+
+    @api.model
+    def convert_vals_list(self, vals_list):
+        """Replace request_data/response_data texts in log create values by
+        references to stored payloads (in place), with one lookup for the
+        whole list."""
+        texts = [
+            vals[text_field]
+            for vals in vals_list
+            for text_field in PAYLOAD_FIELDS
+            if vals.get(text_field)
+        ]
+        ids_by_text = self.store_texts(texts)
+        for vals in vals_list:
+            for text_field, ref_field in PAYLOAD_FIELDS.items():
+                text = vals.pop(text_field, None)
+                if text:
+                    vals[ref_field] = ids_by_text[text]
+        return vals_list
+
+    @api.model
+    def gc_orphans(self):
+        """Delete the payloads no log or log line refers to any more.
+
+        Runs on its own cursors: one holds the exclusive payload lock,
+        which waits for the transactions reusing payloads and keeps new ones
+        from reusing any; the delete runs on a second cursor opened after
+        that, whose snapshot sees every reference they committed.
+        """
+        self.env['cartona.sync.log'].flush_model(list(PAYLOAD_FIELDS.values()))
+        self.env['cartona.sync.log.line'].flush_model(list(PAYLOAD_FIELDS.values()))
+        refs = [
+            (table, column)
+            for table in ('cartona_sync_log', 'cartona_sync_log_line')
+            for column in PAYLOAD_FIELDS.values()
+        ]
+        # One NOT EXISTS per indexed reference column rather than ORed
+        # conditions, so each probe is an index lookup.
+        query = SQL(
+            "DELETE FROM cartona_sync_payload payload WHERE %s",
+            SQL(" AND ").join(
+                SQL(
+                    "NOT EXISTS (SELECT 1 FROM %s ref WHERE %s = payload.id)",
+                    SQL.identifier(table), SQL.identifier('ref', column),
+                )
+                for table, column in refs
+            ),
+        )
+        with self.env.registry.cursor() as lock_cr:
+            lock_cr.execute("SELECT pg_advisory_xact_lock(%s, 0)", (PAYLOAD_GC_LOCK_CLASS,))
+            with self.env.registry.cursor() as cr:
+                cr.execute(query)
+                count = cr.rowcount
+        self.invalidate_model()
+        return count
@@ -1,5 +1,6 @@
 from odoo import models, fields, api, _
 from odoo.exceptions import UserError
+from odoo.modules.registry import Registry
 import json
 import logging
 import time
@@ -7,6 +8,18 @@ import time
 _logger = logging.getLogger(__name__)
 
 
+def _push_sellouts_after_commit(db_name, uid, context, config_id, variant_ids):
+    try:
+        with Registry(db_name).cursor() as cr:
+            env = api.Environment(cr, uid, context)
+            env['product.product'].browse(variant_ids)._push_cartona_sellouts(config_id)
+    except Exception as err:
+        _logger.error(
+            'Cartona sell-out push for config %s failed, left to the outbox: %s',
+            config_id, err,
+        )
+
+
 class ProductProduct(models.Model):
     _inherit = 'product.product'
 
@@ -61,8 +74,9 @@ class ProductProduct(models.Model):
         # (tz, lang, allowed_company_ids, force_company, active_test) when it serializes
         # a job for storage - cartona_config_id would otherwise be silently dropped and
         # _sync_to_cartona would fall back to the wrong config once the job actually runs.
+        kind = 'stock' if sync_fields == 'stock' else 'price'
         record.with_delay(
-            channel='cartona',
+            **config._queue_job_options(kind),
             description=(
                 f'Sync variant {record.display_name} to Cartona '
                 f'[{config.warehouse_id.name}] ({sync_fields})'
@@ -72,20 +86,133 @@ class ProductProduct(models.Model):
     def _trigger_cartona_sync(self, sync_fields, warehouse=None):
         """Route sync jobs by intent.
 
-        - stock: only the config of the affected ``warehouse``.
+        - stock: only the config of the affected ``warehouse`` (every enabled
+          company config when no warehouse is given). Stock is not queued per
+          variant: it is marked dirty in cartona.sync.outbox and pushed in
+          batches by cron_flush_sync_outbox.
         - price/product: fan out to every enabled config of the variant's company.
+          While a config's circuit breaker is open nothing is queued for it:
+          the variant is parked in the outbox instead, whose flush pushes
+          price and stock together once Cartona is reachable again.
         """
         if self.env.context.get('skip_cartona_sync'):
             return
-        config_model = self.env['cartona.config']
+        if sync_fields == 'stock':
+            self._mark_cartona_stock_dirty(warehouse=warehouse)
+            return
+        breaker = self.env['cartona.circuit.breaker'].sudo()
+        outbox = self.env['cartona.sync.outbox'].sudo()
+        open_configs = {}
         for record in self:
-            if sync_fields == 'stock' and warehouse:
-                config = config_model.get_for_warehouse(warehouse)
-                configs = config if (config and config.is_cartona_sync_enabled) else config_model.browse()
-            else:
-                configs = record._cartona_enabled_configs()
-            for config in configs:
-                self._queue_cartona_sync(record, config, sync_fields)
+            for config in record._cartona_enabled_configs():
+                if config.id not in open_configs:
+                    open_configs[config.id] = breaker.is_open(config)
+                if open_configs[config.id]:
+                    outbox.mark_dirty(record, config)
+                else:
+                    self._queue_cartona_sync(record, config, sync_fields)
+
+    def _mark_cartona_stock_dirty(self, warehouse=None):
+        config_model = self.env['cartona.config']
+        by_config = {}
+        if warehouse:
+            config = config_model.get_for_warehouse(warehouse)
+            if config and config.is_cartona_sync_enabled:
+                by_config[config] = self
+        else:
+            for record in self:
+                for config in record._cartona_enabled_configs():
+                    by_config.setdefault(config, self.browse())
+                    by_config[config] |= record
+        outbox = self.env['cartona.sync.outbox'].sudo()
+        for config, products in by_config.items():
+            outbox.mark_dirty(products, config)
+            if warehouse and config.sellout_fast_path:
+                products._schedule_cartona_sellout_push(config)
+
+    def _cartona_sellout_variants(self, config):
+        """Variants whose free quantity in the config's warehouse is now at or
+        below the sell-out threshold while Cartona last got a higher value
+        (or nothing yet)."""
+        variants = self.filtered(lambda variant: not variant.cartona_is_unlimited_stock)
+        if not variants:
+            return variants
+        quantities = variants.with_company(config.company_id).with_context(
+            warehouse_id=config.warehouse_id.id,
+        )._compute_quantities_dict(None, None, None)
+        pushed = self.env['cartona.product.sync'].sudo().pushed_values(config, variants.ids)
+        threshold = config.sellout_threshold
+
+        def crossed(variant):
+            if quantities[variant.id]['free_qty'] > threshold:
+                return False
+            _price, stock, unlimited = pushed.get(variant.id) or (None, None, None)
+            return unlimited or stock is None or stock > threshold
+
+        return variants.filtered(crossed)
+
+    def _schedule_cartona_sellout_push(self, config):
+        """Push variants that just sold out as soon as this transaction commits.
+
+        They are in the outbox as well, so a failed push falls back to the
+        next flush, which drops them as unchanged if the push went through.
+        """
+        variants = self._cartona_sellout_variants(config)
+        if not variants:
+            return
+        key = f'cartona_sellout_push_{config.id}'
+        postcommit = self.env.cr.postcommit
+        pending = postcommit.data.get(key)
+        if pending is None:
+            pending = postcommit.data[key] = set()
+            db_name, uid, context = self.env.cr.dbname, self.env.uid, dict(self.env.context)
+            config_id = config.id
+            postcommit.add(lambda: _push_sellouts_after_commit(
+                db_name, uid, context, config_id, sorted(pending),
+            ))
+        pending.update(variants.ids)
+
+    def _push_cartona_sellouts(self, config_id):
+        config = self.env['cartona.config'].browse(config_id)
+        if not config.exists() or not config.is_cartona_sync_enabled:
+            return
+        variants = self.exists().with_company(config.company_id)
+        if not variants:
+            return
+        sync_recs = self.env['cartona.product.sync'].sudo().ensure_for_products(variants, config)
+        api = self.env['cartona.api'].with_company(config.company_id).with_context(
+            cartona_config_id=config.id,
+            cartona_warehouse_id=config.warehouse_id.id,
+            cartona_request_timeout=config.sellout_push_timeout,
+        )
+        start = time.time()
+        result = api.bulk_update_products(variants, sync_fields='stock')
+        if not result.get('success'):
+            _logger.warning(
+                'Cartona sell-out push for config %s failed, left to the outbox: %s',
+                config.id, result.get('error'),
+            )
+            return
+        sent = variants.browse(result.get('variant_ids') or [])
+        if not sent:
+            return
+        sync_recs.filtered(lambda rec: rec.product_id in sent).mark_success()
+        self.env['cartona.sync.log'].log_operation(
+            cartona_config_id=config.id,
+            operation_type='stock_sync',
+            status='success',
+            message=_('Sell-out pushed immediately for %s variant(s)') % len(sent),
+            records_processed=len(sent),
+            records_success=len(sent),
+            request_data=result.get('request_data'),
+            response_data=result.get('response_data'),
+            duration=time.time() - start,
+            line_vals_list=[
+                self._cartona_sync_log_line_vals(variant, 'stock', payload, result)
+                for variant, payload in zip(sent, result.get('payloads') or [])
+            ],
+            action_type='automated',
+        )
 
     def _cartona_sync_operation_type(self, sync_fields):
         return 'stock_sync' if sync_fields == 'stock' else 'product_sync'
@@ -115,7 +242,7 @@ class ProductProduct(models.Model):
             'response_data': result.get('response_data'),
         }
 
-    def _sync_to_cartona(self, sync_fields='both', config_id=None):
+    def _sync_to_cartona(self, sync_fields='both', config_id=None, force=False):
         self.ensure_one()
         # Prefer the explicit argument (see _queue_cartona_sync); fall back to context
         # only for direct synchronous calls (e.g. action_manual_cartona_sync) and any
@@ -135,11 +262,20 @@ class ProductProduct(models.Model):
             cartona_warehouse_id=warehouse.id,
         )
         start = time.time()
-        result = api.bulk_update_products(self, sync_fields=sync_fields)
+        result = api.bulk_update_products(self, sync_fields=sync_fields, force=force)
         duration = time.time() - start
-        payload = api._build_variant_payload(
-            self, sync_fields, company=config.company_id, warehouse=warehouse,
-        )
+        if result.get('circuit_open'):
+            self.env['cartona.sync.outbox'].sudo().mark_dirty(self, config)
+            sync_rec.mark_deferred(result.get('error'))
+            return
+        if result.get('throttled'):
+            sync_rec.mark_throttled(result.get('error'), result.get('retry_after'))
+            return
+        if result.get('success') and not result.get('variant_ids'):
+            # Cartona already has these values: nothing was sent, nothing to log.
+            sync_rec.mark_success()
+            return
+        payload = (result.get('payloads') or [None])[0]
         log = self.env['cartona.sync.log']
         log_kwargs = {
             'request_data': result.get('request_data'),
@@ -185,7 +321,7 @@ class ProductProduct(models.Model):
         for config in configs:
             self.with_context(
                 cartona_log_action_type='manual',
-            )._sync_to_cartona('both', config_id=config.id)
+            )._sync_to_cartona('both', config_id=config.id, force=True)
             if self._cartona_sync_record(config).sync_status == 'synced':
                 synced += 1
         return {
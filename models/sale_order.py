@@ -1,5 +1,6 @@
 from odoo import models, fields, api, _
 from odoo.exceptions import UserError
+from odoo.addons.queue_job.exception import RetryableJobError
 import logging
 
 _logger = logging.getLogger(__name__)
@@ -23,7 +24,8 @@ class SaleOrder(models.Model):
         ('syncing', 'Syncing'),
         ('synced', 'Synced'),
         ('error', 'Sync Error'),
-    ], default='not_synced')
+        ('deferred', 'Deferred (Cartona unavailable)'),
+    ], default='not_synced', index=True)
     cartona_sync_date = fields.Datetime(readonly=True)
     cartona_error_message = fields.Text(readonly=True)
     is_cartona_order = fields.Boolean(
@@ -73,12 +75,23 @@ class SaleOrder(models.Model):
         return allowed
 
     def _trigger_status_sync(self):
+        """Queue one status push per order, or park the order as deferred
+        while its config's circuit breaker is open (resumed by
+        cartona.api.resume_deferred_order_status once it closes)."""
+        breaker = self.env['cartona.circuit.breaker'].sudo()
+        open_configs = {}
         for order in self:
             if order.cartona_id and order.cartona_config_id:
+                config = order.cartona_config_id
+                if config.id not in open_configs:
+                    open_configs[config.id] = breaker.is_open(config)
+                if open_configs[config.id]:
+                    order.write({'cartona_sync_status': 'deferred'})
+                    continue
                 order.with_context(
                     cartona_config_id=order.cartona_config_id.id,
                 ).with_delay(
-                    channel='cartona',
+                    **order.cartona_config_id._queue_job_options('orders'),
                     description=f'Sync order status {order.name} to Cartona',
                 )._sync_status_to_cartona()
 
@@ -107,6 +120,12 @@ class SaleOrder(models.Model):
                 return
 
             result = api_client.update_single_order_status(self, cartona_status)
+            if isinstance(result, dict) and result.get('circuit_open'):
+                self.write({
+                    'cartona_sync_status': 'deferred',
+                    'cartona_error_message': result.get('error'),
+                })
+                return
             if not isinstance(result, dict):
                 self.write({
                     'cartona_sync_status': 'error',
@@ -126,6 +145,9 @@ class SaleOrder(models.Model):
                     'cartona_sync_status': 'error',
                     'cartona_error_message': result.get('error', 'Unknown error'),
                 })
+        except RetryableJobError:
+            # Postponed by the rate limiter / circuit breaker: let queue_job reschedule it.
+            raise
         except Exception as err:
             self.write({
                 'cartona_sync_status': 'error',
@@ -231,6 +253,8 @@ class SaleOrder(models.Model):
                     records_error=1,
                     error_details=error_msg,
                 )
+        except RetryableJobError:
+            raise
         except Exception as err:
             self.write({
                 'cartona_sync_status': 'error',
@@ -310,6 +334,8 @@ class SaleOrder(models.Model):
                     records_error=1,
                     error_details=error_msg,
                 )
+        except RetryableJobError:
+            raise
         except Exception as err:
             error_msg = str(err)
             self.write({
@@ -350,7 +376,7 @@ class SaleOrderLine(models.Model):
                 order.with_context(
                     cartona_config_id=order.cartona_config_id.id,
                 ).with_delay(
-                    channel='cartona',
+                    **order.cartona_config_id._queue_job_options('orders'),
                     description=f'Sync order details to Cartona [{order.name}]',
                 )._sync_order_details_to_cartona()
 
@@ -385,7 +411,7 @@ class SaleOrderLine(models.Model):
                     order.with_context(
                         cartona_config_id=order.cartona_config_id.id,
                     ).with_delay(
-                        channel='cartona',
+                        **order.cartona_config_id._queue_job_options('orders'),
                         description=f'Cancel line {line_id} on Cartona order [{order.name}]',
                     )._sync_cancelled_line_to_cartona(line_id)
         return result
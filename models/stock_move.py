@@ -102,7 +102,7 @@ class StockPicking(models.Model):
                     order.with_context(
                         cartona_config_id=order.cartona_config_id.id,
                     ).with_delay(
-                        channel='cartona',
+                        **order.cartona_config_id._queue_job_options('orders'),
                         description=f'Sync delivery validation for order {order.name}',
                     )._sync_delivery_validation_to_cartona()
         return result
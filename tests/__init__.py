@@ -0,0 +1,7 @@
+from . import test_queue_jobs
+from . import test_product_sync
+from . import test_sync_log
+from . import test_http_pool
+from . import test_order_pull
+from . import test_api_guard
+from . import test_log_partition
@@ -0,0 +1,44 @@
+from contextlib import contextmanager
+
+from odoo.tests.common import TransactionCase
+
+from odoo.addons.queue_job.controllers.main import RunJobController
+from odoo.addons.queue_job.job import Job
+
+
+class CartonaCase(TransactionCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.warehouse = cls.env['stock.warehouse'].create({
+            'name': 'Cartona Test Warehouse',
+            'code': 'CTW',
+        })
+        cls.config = cls.env['cartona.config'].create({
+            'warehouse_id': cls.warehouse.id,
+            'api_base_url': 'https://cartona.test/api/v1/',
+            'auth_token': 'test-token',
+            'is_cartona_sync_enabled': True,
+        })
+
+    def enter_test_mode(self):
+        """Make new cursors share the test transaction, their commits
+        becoming savepoints."""
+        self.env.flush_all()
+        self.registry.enter_test_mode(self.cr)
+        self.addCleanup(self.registry.leave_test_mode)
+
+    @contextmanager
+    def committing_env(self):
+        """Environment on a cursor the code under test may commit."""
+        self.enter_test_mode()
+        with self.registry.cursor() as cr:
+            yield self.env(cr=cr)
+
+    def run_job(self, job):
+        """Run ``job`` the way the job runner does, with commits allowed
+        only for job functions declaring allow_commit."""
+        self.enter_test_mode()
+        job = Job.load(self.env, job.uuid)
+        RunJobController._runjob(self.env, job)
+        return job
@@ -0,0 +1,54 @@
+from .common import CartonaCase
+
+
+class TestApiGuard(CartonaCase):
+    def _row_version(self, table):
+        self.env.cr.execute(
+            f"SELECT ctid FROM {table} WHERE cartona_config_id = %s",
+            (self.config.id,),
+        )
+        return self.env.cr.fetchall()
+
+    def test_rate_limit_row_created_with_config(self):
+        rate_limit = self.env['cartona.rate.limit'].search(
+            [('cartona_config_id', '=', self.config.id)])
+        self.assertEqual(len(rate_limit), 1)
+        self.assertEqual(rate_limit.tokens, self.config.rate_limit_burst)
+
+    def test_rate_limit_off_is_read_only(self):
+        self.assertEqual(self.config.rate_limit_per_minute, 0)
+        rate_limit = self.env['cartona.rate.limit']
+        self.enter_test_mode()
+        before = self._row_version('cartona_rate_limit')
+        self.assertEqual(rate_limit.acquire(self.config), 0)
+        self.assertEqual(self._row_version('cartona_rate_limit'), before)
+
+        rate_limit.block(self.config, 120)
+        blocked = self._row_version('cartona_rate_limit')
+        self.assertGreater(rate_limit.acquire(self.config), 60)
+        self.assertEqual(self._row_version('cartona_rate_limit'), blocked)
+
+    def test_rate_limit_consumes_tokens(self):
+        self.config.write({'rate_limit_per_minute': 1, 'rate_limit_burst': 1})
+        rate_limit = self.env['cartona.rate.limit']
+        self.enter_test_mode()
+        self.assertEqual(rate_limit.acquire(self.config), 0)
+        self.assertGreater(rate_limit.acquire(self.config), 0)
+
+    def test_breaker_row_created_with_config(self):
+        breaker = self.env['cartona.circuit.breaker'].search(
+            [('cartona_config_id', '=', self.config.id)])
+        self.assertEqual(len(breaker), 1)
+        self.assertEqual(breaker.state, 'closed')
+
+    def test_closed_breaker_is_read_only(self):
+        breaker = self.env['cartona.circuit.breaker']
+        self.enter_test_mode()
+        before = self._row_version('cartona_circuit_breaker')
+        self.assertEqual(breaker.allow_request(self.config), (0, False))
+        self.assertEqual(self._row_version('cartona_circuit_breaker'), before)
+
+        breaker.record_failure(self.config, 'timeout')
+        failed = self._row_version('cartona_circuit_breaker')
+        self.assertEqual(breaker.allow_request(self.config), (0, True))
+        self.assertEqual(self._row_version('cartona_circuit_breaker'), failed)
@@ -0,0 +1,23 @@
+from unittest import mock
+
+from odoo.addons.cartona_odoo.models import cartona_http
+
+from .common import CartonaCase
+
+
+class TestHttpPool(CartonaCase):
+    def test_pool_stats_on_config(self):
+        self.addCleanup(cartona_http.drop_session, self.env.cr.dbname, self.config.id)
+        self.assertEqual(self.config.http_pool_requests, 0)
+        pooled = cartona_http.get_session(self.config)
+        self.assertIs(cartona_http.get_session(self.config), pooled)
+        with mock.patch.object(pooled.session, 'request'):
+            for _index in range(3):
+                pooled.request('GET', self.config.api_base_url)
+        self.config.invalidate_recordset()
+        self.assertEqual(self.config.http_pool_requests, 3)
+        self.assertEqual(self.config.http_pool_new_connections, 0)
+        self.assertEqual(self.config.http_pool_reused_connections, 3)
+        self.assertEqual(
+            cartona_http.session_stats(self.env.cr.dbname, self.config.id)['requests'], 3,
+        )
@@ -0,0 +1,41 @@
+from odoo.addons.cartona_odoo.models import cartona_log_partition
+
+from .common import CartonaCase
+
+LOG_MODELS = ['cartona.sync.log', 'cartona.sync.log.line']
+
+
+class TestLogPartition(CartonaCase):
+    def _update_schema(self):
+        """Run the schema update of the log models, as ``-u`` does."""
+        self.env.flush_all()
+        self.registry.init_models(self.cr, LOG_MODELS, {'module': 'cartona_odoo'}, install=False)
+
+    def _column(self, table, column):
+        self.env.cr.execute("""
+            SELECT is_nullable FROM information_schema.columns
+            WHERE table_name = %s AND column_name = %s
+        """, (table, column))
+        return self.env.cr.fetchone()
+
+    def test_update_after_partitioning(self):
+        cartona_log_partition.partition_tables(self.env.cr)
+        for table in cartona_log_partition.PARTITIONED_TABLES:
+            self.assertTrue(cartona_log_partition.is_partitioned(self.env.cr, table))
+        # A column added by a later version, created by the schema update.
+        self.env.cr.execute("ALTER TABLE cartona_sync_log DROP COLUMN response_payload_id")
+
+        self._update_schema()
+
+        self.assertTrue(self._column('cartona_sync_log', 'response_payload_id'))
+        for table in cartona_log_partition.PARTITIONED_TABLES:
+            self.assertEqual(self._column(table, 'create_date'), ('NO',))
+        self.env['cartona.sync.log'].invalidate_model()
+        log = self.env['cartona.sync.log'].sudo().create({
+            'cartona_config_id': self.config.id,
+            'operation_type': 'product_sync',
+            'status': 'success',
+            'message': 'After update',
+        })
+        self.assertTrue(log.create_date)
+        self.assertFalse(log.response_payload_id)
@@ -0,0 +1,32 @@
+from unittest import mock
+
+from odoo.addons.cartona_odoo.models.cartona_api import ORDER_PULL_LOCK_CLASS, CartonaAPI
+
+from .common import CartonaCase
+
+
+class TestOrderPull(CartonaCase):
+    def _held_locks(self):
+        self.env.cr.execute("""
+            SELECT COUNT(*) FROM pg_locks
+            WHERE locktype = 'advisory' AND classid = %s AND objid = %s
+        """, (ORDER_PULL_LOCK_CLASS, self.config.id))
+        return self.env.cr.fetchone()[0]
+
+    def test_lock_released_after_failed_pull(self):
+        self.enter_test_mode()
+        api = self.env['cartona.api'].with_context(cartona_config_id=self.config.id)
+        with mock.patch.object(
+            CartonaAPI, '_pull_and_process_orders_locked', autospec=True,
+            side_effect=RuntimeError('boom'),
+        ), self.assertRaises(RuntimeError):
+            api.pull_and_process_orders()
+        self.assertEqual(self._held_locks(), 0)
+        with mock.patch.object(
+            CartonaAPI, '_pull_and_process_orders_locked', autospec=True,
+            return_value={'success': True, 'orders_pulled': 0},
+        ) as pull:
+            result = api.pull_and_process_orders()
+        self.assertTrue(pull.called)
+        self.assertEqual(result['orders_pulled'], 0)
+        self.assertEqual(self._held_locks(), 0)
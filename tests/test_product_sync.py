@@ -0,0 +1,56 @@
+from unittest import mock
+
+from odoo import fields
+
+from odoo.addons.cartona_odoo.models.cartona_api import CartonaAPI
+
+from .common import CartonaCase
+
+
+class TestProductSync(CartonaCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.variants = cls.env['product.product'].create([
+            {'name': 'Cartona Fresh Variant', 'sale_ok': True},
+            {'name': 'Cartona Failing Variant', 'sale_ok': True},
+            {'name': 'Cartona Dead Variant', 'sale_ok': True},
+        ])
+        cls.sync_recs = cls.env['cartona.product.sync'].ensure_for_products(
+            cls.variants, cls.config,
+        )
+        cls.failing_rec = cls.sync_recs.filtered(
+            lambda rec: rec.product_id == cls.variants[1],
+        )
+        cls.failing_rec.write({'sync_status': 'error', 'attempt_count': 3})
+        cls.dead_rec = cls.sync_recs.filtered(
+            lambda rec: rec.product_id == cls.variants[2],
+        )
+        cls.dead_rec.write({
+            'sync_status': 'dead',
+            'attempt_count': cls.config.sync_retry_max_attempts,
+            'next_attempt_at': False,
+        })
+
+    def test_throttled_batch_not_counted_as_attempt(self):
+        throttled = {
+            'success': False,
+            'error': 'Rate limit reached',
+            'throttled': True,
+            'retry_after': 30,
+        }
+        api = self.env['cartona.api'].with_context(cartona_config_id=self.config.id)
+        with mock.patch.object(
+            CartonaAPI, 'bulk_update_products', autospec=True, return_value=throttled,
+        ):
+            success, error, lines, _result = api._sync_one_batch(self.config, self.variants)
+        self.assertEqual((success, error, lines), (0, 0, []))
+        fresh_rec = self.sync_recs - self.failing_rec - self.dead_rec
+        self.assertEqual(fresh_rec.sync_status, 'not_synced')
+        self.assertEqual(fresh_rec.attempt_count, 0)
+        self.assertEqual(self.failing_rec.sync_status, 'error')
+        self.assertEqual(self.failing_rec.attempt_count, 3)
+        for rec in fresh_rec | self.failing_rec:
+            self.assertGreater(rec.next_attempt_at, fields.Datetime.now())
+        self.assertEqual(self.dead_rec.sync_status, 'dead')
+        self.assertFalse(self.dead_rec.next_attempt_at)
@@ -0,0 +1,36 @@
+from unittest import mock
+
+from odoo.addons.cartona_odoo.models.cartona_api import CartonaAPI
+
+from .common import CartonaCase
+
+
+class TestQueueJobs(CartonaCase):
+    def test_sync_all_variants_job_commits(self):
+        self.env['product.product'].create({'name': 'Cartona Test Variant', 'sale_ok': True})
+        job = self.config.with_delay().sync_all_variants_job()
+        job = self.run_job(job)
+        self.assertEqual(job.db_record().state, 'done')
+        batch_jobs = self.env['queue.job'].search([
+            ('model_name', '=', 'cartona.api'),
+            ('method_name', '=', 'sync_variant_batch_job'),
+        ])
+        self.assertTrue(batch_jobs)
+
+    def test_reconcile_catalog_job_commits(self):
+        pages = [
+            {'success': True, 'page': 1, 'data': [{'internal_product_id': '0'}]},
+            {'success': True, 'page': 2, 'data': []},
+        ]
+        job = self.env['cartona.api'].with_delay().reconcile_catalog_job(self.config.id)
+        with mock.patch.object(
+            CartonaAPI, 'list_supplier_products', autospec=True, return_value=iter(pages),
+        ):
+            job = self.run_job(job)
+        self.assertEqual(job.db_record().state, 'done')
+        report = self.env['cartona.drift.report'].search([
+            ('cartona_config_id', '=', self.config.id),
+        ])
+        self.assertEqual(report.state, 'done')
+        self.assertEqual(report.pages_scanned, 1)
+        self.assertEqual(report.unmapped_count, 1)
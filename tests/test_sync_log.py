@@ -0,0 +1,42 @@
+from .common import CartonaCase
+
+
+class TestSyncLog(CartonaCase):
+    def _old_log(self, line_count):
+        log = self.env['cartona.sync.log'].sudo().create({
+            'cartona_config_id': self.config.id,
+            'operation_type': 'product_sync',
+            'status': 'error',
+            'message': 'Old log',
+        })
+        self.env['cartona.sync.log.line'].sudo()._bulk_insert(log, [
+            {'status': 'error', 'message': f'Old line {index}'}
+            for index in range(line_count)
+        ])
+        self.env.cr.execute("""
+            UPDATE cartona_sync_log_line
+            SET create_date = create_date - interval '40 days'
+            WHERE sync_log_id = %s
+        """, (log.id,))
+        self.env.cr.execute("""
+            UPDATE cartona_sync_log
+            SET create_date = create_date - interval '40 days'
+            WHERE id = %s
+        """, (log.id,))
+        return log
+
+    def test_purge_report_ignores_log_level(self):
+        self.config.log_level = 'errors'
+        old_log = self._old_log(3)
+        with self.committing_env() as env:
+            deleted = env['cartona.sync.log'].cleanup_old_logs(days=30, chunk_size=2)
+        self.assertEqual(deleted, 1)
+        self.env.invalidate_all()
+        self.assertFalse(old_log.exists())
+        report = self.env['cartona.sync.log'].search([
+            ('cartona_config_id', '=', self.config.id),
+            ('operation_type', '=', 'bulk_operation'),
+        ])
+        self.assertEqual(len(report), 1)
+        self.assertEqual(report.status, 'info')
+        self.assertEqual(report.records_processed, 4)